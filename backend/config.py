@@ -28,6 +28,12 @@ class Settings(BaseSettings):
     PYARCHINIT_DB_USER: str = os.getenv("PYARCHINIT_DB_USER", "postgres")
     PYARCHINIT_DB_PASSWORD: str = os.getenv("PYARCHINIT_DB_PASSWORD", "")
 
+    # PostgreSQL connection pool (ignored for SQLite)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "20"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Seconds before a connection is replaced
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # Seconds to wait for a free connection
+
     # Separate Mode Configuration
     SEPARATE_DB_NAME_TEMPLATE: str = os.getenv("SEPARATE_DB_NAME_TEMPLATE", "pyarchinit_user")
     
@@ -57,6 +63,9 @@ class Settings(BaseSettings):
     MAX_AUDIO_SIZE: int = 25 * 1024 * 1024  # 25MB
     MAX_IMAGE_SIZE: int = 10 * 1024 * 1024  # 10MB
     MAX_3D_MODEL_SIZE: int = 100 * 1024 * 1024  # 100MB for 3D models
+    # Resumable uploads (/api/media/upload-init): declared size cap and idle expiry
+    MAX_RESUMABLE_UPLOAD_SIZE: int = int(os.getenv("MAX_RESUMABLE_UPLOAD_SIZE", str(10 * 1024 * 1024 * 1024)))  # 10GB
+    RESUMABLE_UPLOAD_TTL: int = int(os.getenv("RESUMABLE_UPLOAD_TTL", str(24 * 3600)))  # seconds since last chunk
     ALLOWED_AUDIO_FORMATS: list = [".mp3", ".wav", ".m4a", ".ogg", ".webm"]
     ALLOWED_IMAGE_FORMATS: list = [".jpg", ".jpeg", ".png", ".tiff", ".tif"]
     ALLOWED_3D_MODEL_FORMATS: list = [".obj", ".gltf", ".glb", ".usdz"]
@@ -66,6 +75,9 @@ class Settings(BaseSettings):
     
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
+    # Key for stored connection secrets (pg_password); independent of SECRET_KEY
+    # so JWT key rotation does not lock out saved database credentials
+    SECRET_ENCRYPTION_KEY: str = os.getenv("SECRET_ENCRYPTION_KEY", "")
     # CORS Origins - Comma-separated string that will be parsed into a list
     # Example: "http://localhost:5173,https://pyarchinit-mobile-pwa.vercel.app"
     CORS_ORIGINS_STR: str = os.getenv(
@@ -51,10 +51,17 @@ async def get_current_project(
             detail="Project ID required. Send X-Project-ID header."
         )
 
-    # Check if project exists
+    # Check project existence and user access in one lookup
+    # (owners are stored in project_teams too, so no UNION with projects.owner_id)
     project_row = db.execute(
-        text("SELECT id, name FROM projects WHERE id = :project_id"),
-        {"project_id": project_id}
+        text("""
+            SELECT p.id, p.name, pt.role
+            FROM projects p
+            LEFT JOIN project_teams pt
+                ON pt.project_id = p.id AND pt.user_id = :user_id
+            WHERE p.id = :project_id
+        """),
+        {"project_id": project_id, "user_id": current_user.id}
     ).fetchone()
 
     if not project_row:
@@ -63,16 +70,7 @@ async def get_current_project(
             detail=f"Project {project_id} not found"
         )
 
-    # Check if user has access
-    access_check = db.execute(
-        text("""
-            SELECT role FROM project_teams
-            WHERE project_id = :project_id AND user_id = :user_id
-        """),
-        {"project_id": project_id, "user_id": current_user.id}
-    ).fetchone()
-
-    if not access_check:
+    if project_row[2] is None:
         raise HTTPException(
             status_code=403,
             detail=f"Access denied to project '{project_row[1]}'"
@@ -9,10 +9,15 @@ Supports both SQLite and PostgreSQL databases based on DB_MODE.
 """
 
 import sys
+import os
 import json
 import ast
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from sqlalchemy import text
-from services.db_manager import db_manager
+from backend.services.db_manager import db_manager
 
 def fix_interpretations():
     """Fix all ai_interpretation fields with improper JSON format"""
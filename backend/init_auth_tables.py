@@ -18,7 +18,7 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config import settings
+from backend.config import settings
 from backend.models.auth_base import AuthBase
 from backend.services.db_manager import get_auth_engine
 
@@ -11,7 +11,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy import create_engine
 from backend.config import settings
-from backend.models.auth import Base
+from backend.models import auth  # noqa: F401 - registers auth models on AuthBase
+from backend.models.auth_base import AuthBase
 from backend.models.database import Base as DBBase
 
 
@@ -39,7 +40,7 @@ def init_database():
         print("\nCreating all tables from models...")
 
         # Create all tables defined in models
-        Base.metadata.create_all(bind=engine)
+        AuthBase.metadata.create_all(bind=engine)
         DBBase.metadata.create_all(bind=engine)
 
         print("✅ Database initialized successfully!")
@@ -1,30 +1,34 @@
 import sys
 import os
-import json
+import ast
+import logging
+import orjson
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Depends, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import create_engine, inspect, text
+from fastapi.responses import JSONResponse, FileResponse, ORJSONResponse
+from sqlalchemy.orm import Session, undefer_group
+from sqlalchemy import create_engine, inspect, select, text
 from typing import List, Optional
-import shutil
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime, timezone
 from pydantic import BaseModel
 
 from backend.config import settings
-from backend.models.database import get_db, Media, MobileNote, US, Site, Model3D, init_db
+from backend.models.database import get_db, engine, Media, MobileNote, US, Site, Model3D, init_db
 from backend.services.db_manager import get_auth_db
 from backend.services.image_processor import ImageProcessor, ImageValidator
 from backend.services.ai_processor import ArchaeologicalAIInterpreter
-from backend.services.stratigraphic_utils import parse_relationships, format_relationships_for_db
+from backend.services.stratigraphic_utils import parse_relationships, format_relationships_for_db, format_list_fields_for_db
 from backend.services.auth_service import get_current_user
+from backend.services.upload_utils import save_upload_file
 from backend.models.auth import User
 from backend.routes import auth, media, database, notes, tropy, annotations, projects, migrations
 
+logger = logging.getLogger(__name__)
+
 
 # Pydantic models for API requests
 class DatabaseConfig(BaseModel):
@@ -43,6 +47,10 @@ class ConfirmNoteRequest(BaseModel):
     target_table: str
     force_action: Optional[str] = None  # 'merge' or 'overwrite'
 
+
+# US fields stored as list-of-lists JSON in PyArchInit
+US_LIST_FIELDS = ('inclusi', 'campioni', 'componenti_organici', 'componenti_inorganici', 'documentazione')
+
 # ============================================================================
 # DATABASE INITIALIZATION (TWO SEPARATE DATABASES)
 # ============================================================================
@@ -61,7 +69,6 @@ try:
     init_auth_tables()
     print("✅ Auth database initialized")
 except Exception as e:
-    import logging
     logging.error(f"❌ Auth database initialization failed: {e}")
     raise
 
@@ -72,7 +79,6 @@ if settings.USE_SQLITE or settings.DB_MODE == "sqlite":
         init_db()
         print("✅ PyArchInit database initialized")
     except Exception as e:
-        import logging
         logging.error(f"❌ PyArchInit database initialization failed: {e}")
         raise
 else:
@@ -93,7 +99,6 @@ try:
         pyarchinit_engine=pyarchinit_engine
     )
 except Exception as e:
-    import logging
     logging.warning(f"⚠️  Auto-migration warning: {e}")
 
 print("=" * 60)
@@ -103,7 +108,8 @@ print("=" * 60)
 app = FastAPI(
     title="PyArchInit Mobile API",
     description="API per gestione note vocali e foto archeologiche",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS configuration
@@ -137,6 +143,24 @@ app.include_router(migrations.router)
 image_processor = ImageProcessor()
 ai_interpreter = ArchaeologicalAIInterpreter()
 
+
+@app.on_event("startup")
+def warm_up_connection_pool():
+    """Open the PostgreSQL pool upfront so early requests skip the connect handshake"""
+    if engine.dialect.name == "sqlite":
+        return
+
+    connections = []
+    try:
+        for _ in range(settings.DB_POOL_SIZE):
+            connections.append(engine.connect())
+    except Exception as e:
+        logger.warning(f"⚠️  Connection pool warm-up incomplete: {e}")
+    finally:
+        # Closing returns each connection to the pool instead of disconnecting
+        for conn in connections:
+            conn.close()
+
 # ============= HEALTH CHECK =============
 
 @app.get("/")
@@ -247,7 +271,7 @@ async def get_database_mode(current_user: User = Depends(get_current_user), db:
     """Get current user's database mode configuration"""
     from backend.models.auth import User
 
-    user = db.query(User).filter(User.id == current_user.id).first()
+    user = db.get(User, current_user.id, options=[undefer_group("connection")])
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -276,7 +300,7 @@ async def configure_database(
     if mode not in ["sqlite", "separate", "hybrid"]:
         raise HTTPException(status_code=400, detail="Invalid database mode")
 
-    user = db.query(User).filter(User.id == current_user.id).first()
+    user = db.get(User, current_user.id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -289,7 +313,7 @@ async def configure_database(
         user.pg_port = config.get("port")
         user.pg_database = config.get("database")
         user.pg_user = config.get("user")
-        user.pg_password = config.get("password")  # TODO: Encrypt in production
+        user.pg_password = config.get("password")  # encrypted by the column type
 
     db.commit()
 
@@ -308,13 +332,12 @@ async def upload_sqlite_database(
 ):
     """Upload SQLite database file for current user"""
     from backend.models.auth import User
-    import shutil
 
     # Validate file extension
     if not file.filename.endswith(('.sqlite', '.db')):
         raise HTTPException(status_code=400, detail="File must be .sqlite or .db")
 
-    user = db.query(User).filter(User.id == current_user.id).first()
+    user = db.get(User, current_user.id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -327,8 +350,7 @@ async def upload_sqlite_database(
         db_filename = f"pyarchinit_user_{user.id}.sqlite"
         db_path = sqlite_dir / db_filename
 
-        with open(db_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await save_upload_file(file, db_path)
 
         # Update user's SQLite path
         user.sqlite_db_path = str(db_path)
@@ -353,7 +375,7 @@ async def download_sqlite_database(
     """Download current user's SQLite database"""
     from backend.models.auth import User
 
-    user = db.query(User).filter(User.id == current_user.id).first()
+    user = db.get(User, current_user.id, options=[undefer_group("connection")])
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -388,7 +410,7 @@ def get_current_admin(current_user: User = Depends(get_current_user), db: Sessio
     """Verify current user is an admin"""
     from backend.models.auth import User
 
-    user = db.query(User).filter(User.id == current_user.id).first()
+    user = db.get(User, current_user.id)
     if not user or user.role != 'admin':
         raise HTTPException(status_code=403, detail="Admin access required")
     return user
@@ -428,7 +450,7 @@ async def toggle_user_active(
     """Activate or deactivate a user (admin only)"""
     from backend.models.auth import User
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -465,7 +487,7 @@ async def change_user_role(
     if role not in valid_roles:
         raise HTTPException(status_code=400, detail=f"Invalid role. Must be one of: {', '.join(valid_roles)}")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -496,7 +518,7 @@ async def approve_user(
     """Approve user registration (admin only)"""
     from backend.models.auth import User
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -525,7 +547,7 @@ async def reject_user(
     """Reject user registration (admin only)"""
     from backend.models.auth import User
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -550,7 +572,10 @@ async def reject_user(
 @app.get("/api/sites")
 async def list_sites(db: Session = Depends(get_db)):
     """Lista tutti i siti disponibili"""
-    sites = db.query(Site).all()
+    # Plain rows, no ORM hydration: only the columns the list shows
+    sites = db.execute(
+        select(Site.id_sito, Site.sito, Site.comune, Site.provincia, Site.nazione)
+    ).all()
     return {
         "sites": [
             {
@@ -749,9 +774,11 @@ async def get_media_by_entity(
     db: Session = Depends(get_db)
 ):
     """Lista media per entità (US, TOMBA, etc.)"""
-    media_list = db.query(Media).filter(
-        Media.entity_type == entity_type,
-        Media.id_entity == entity_id
+    media_list = db.execute(
+        select(Media.id_media, Media.filename, Media.descrizione, Media.tags).where(
+            Media.entity_type == entity_type,
+            Media.id_entity == entity_id
+        )
     ).all()
     
     return {
@@ -804,9 +831,12 @@ async def upload_3d_model(
             detail=f"Formato non supportato. Formati permessi: {', '.join(settings.ALLOWED_3D_MODEL_FORMATS)}"
         )
 
-    # Read file and check size
-    contents = await file.read()
-    file_size = len(contents)
+    # Check size (known once the upload is spooled) without reading it into memory
+    file_size = file.size
+    if file_size is None:
+        file.file.seek(0, os.SEEK_END)
+        file_size = file.file.tell()
+        file.file.seek(0)
 
     if file_size > settings.MAX_3D_MODEL_SIZE:
         raise HTTPException(
@@ -822,8 +852,7 @@ async def upload_3d_model(
 
         # Save to original directory
         filepath = settings.PYARCHINIT_3D_MODELS_ORIGINAL / filename
-        with open(filepath, "wb") as f:
-            f.write(contents)
+        await save_upload_file(file, filepath)
 
         # Determine file format
         file_format = file_ext.replace(".", "").upper()
@@ -846,7 +875,7 @@ async def upload_3d_model(
             gps_lon=gps_lon,
             gps_altitude=gps_altitude,
             uploaded_by=uploaded_by,
-            created_at=datetime.utcnow()
+            created_at=datetime.now(timezone.utc)
         )
 
         db.add(model_3d)
@@ -919,9 +948,14 @@ async def get_3d_models_by_entity(
     db: Session = Depends(get_db)
 ):
     """List 3D models for entity (US, SITE, etc.)"""
-    models = db.query(Model3D).filter(
-        Model3D.entity_type == entity_type,
-        Model3D.id_entity == entity_id
+    models = db.execute(
+        select(
+            Model3D.id_3d_model, Model3D.filename, Model3D.file_format, Model3D.model_name,
+            Model3D.capture_method, Model3D.file_size, Model3D.created_at
+        ).where(
+            Model3D.entity_type == entity_type,
+            Model3D.id_entity == entity_id
+        )
     ).all()
 
     return {
@@ -994,8 +1028,7 @@ async def upload_audio_note(
     audio_filename = f"note_{timestamp}_{file.filename}"
     audio_path = temp_dir / audio_filename
     
-    with open(audio_path, 'wb') as f:
-        shutil.copyfileobj(file.file, f)
+    await save_upload_file(file, audio_path)
     
     # Crea record nota
     note = MobileNote(
@@ -1031,22 +1064,30 @@ async def list_notes(
     db: Session = Depends(get_db)
 ):
     """Lista note vocali con filtri"""
-    query = db.query(MobileNote)
+    query = select(
+        MobileNote.id, MobileNote.status, MobileNote.transcription, MobileNote.ai_interpretation,
+        MobileNote.ai_confidence, MobileNote.suggested_entity_type, MobileNote.recorded_at,
+        MobileNote.recorded_by
+    )
 
     if status:
-        query = query.filter(MobileNote.status == status)
+        query = query.where(MobileNote.status == status)
     if sito:
-        query = query.filter(MobileNote.site_context == sito)
+        query = query.where(MobileNote.site_context == sito)
 
-    notes = query.order_by(MobileNote.created_at.desc()).limit(limit).all()
+    notes = db.execute(query.order_by(MobileNote.created_at.desc()).limit(limit)).all()
 
     def parse_interpretation(ai_interp):
         """Convert Python dict string to JSON-compatible format"""
         if not ai_interp:
             return None
         try:
-            # Try to eval Python dict string and convert to JSON
-            import ast
+            # Stored as JSON by the notes router
+            return orjson.loads(ai_interp)
+        except orjson.JSONDecodeError:
+            pass
+        try:
+            # Legacy rows: eval Python dict string and convert to JSON
             parsed = ast.literal_eval(ai_interp)
             return parsed
         except:
@@ -1088,7 +1129,7 @@ async def validate_note(
     if not approved:
         note.status = 'rejected'
         note.validated_by = validated_by
-        note.validated_at = datetime.utcnow()
+        note.validated_at = datetime.now(timezone.utc)
         db.commit()
         
         return {
@@ -1097,8 +1138,7 @@ async def validate_note(
         }
     
     # Parse interpretazione AI
-    import json
-    interpretation = json.loads(note.ai_interpretation) if isinstance(note.ai_interpretation, str) else note.ai_interpretation
+    interpretation = orjson.loads(note.ai_interpretation) if isinstance(note.ai_interpretation, str) else note.ai_interpretation
     
     # TODO: Crea record nella tabella PyArchInit appropriata
     # Esempio per US:
@@ -1114,7 +1154,7 @@ async def validate_note(
     
     note.status = 'validated'
     note.validated_by = validated_by
-    note.validated_at = datetime.utcnow()
+    note.validated_at = datetime.now(timezone.utc)
     db.commit()
     
     return {
@@ -1156,21 +1196,35 @@ async def confirm_note(
             check_us = str(extracted_fields.get('us')) if extracted_fields.get('us') else None
             check_tipo = str(extracted_fields.get('unita_tipo', 'US'))
 
-            print(f"[DUPLICATE CHECK] Sito: {check_sito}, Area: {check_area}, US: {check_us}, Tipo: {check_tipo}")
-            print(f"[FORCE_ACTION] Received force_action: {request.force_action!r}, type: {type(request.force_action)}")
+            logger.debug("[DUPLICATE CHECK] Sito: %s, Area: %s, US: %s, Tipo: %s", check_sito, check_area, check_us, check_tipo)
+            logger.debug("[FORCE_ACTION] Received force_action: %r", request.force_action)
 
-            existing_us = db.query(US).filter(
+            duplicate_filter = (
                 US.sito == check_sito,
                 US.area == check_area,
                 US.us == check_us,
                 US.unita_tipo == check_tipo
-            ).first()
+            )
 
-            if existing_us:
-                print(f"[DUPLICATE FOUND] Existing US: id_us={existing_us.id_us}, sito={existing_us.sito}, area={existing_us.area}, us={existing_us.us}")
+            # Merge/overwrite need the ORM row; otherwise only probe for the id
+            existing_us = None
+            if request.force_action in ('merge', 'overwrite'):
+                query = db.query(US).filter(*duplicate_filter)
+                if request.force_action == 'merge':
+                    # Merge compares every extracted field, load the deferred text in one go
+                    query = query.options(undefer_group("bulk_text"))
+                existing_us = query.first()
+                existing_id = existing_us.id_us if existing_us else None
+            else:
+                existing_id = db.execute(
+                    select(US.id_us).where(*duplicate_filter).limit(1)
+                ).scalar()
+
+            if existing_id is not None:
+                logger.debug("[DUPLICATE FOUND] Existing US: id_us=%s", existing_id)
 
             # Handle duplicates based on force_action
-            if existing_us and not request.force_action:
+            if existing_id is not None and not request.force_action:
                 # No force action - return error to show dialog
                 raise HTTPException(
                     status_code=409,
@@ -1179,6 +1233,8 @@ async def confirm_note(
             elif existing_us and request.force_action == 'overwrite':
                 # Overwrite: Delete existing and create new
                 db.delete(existing_us)
+                # Flush the DELETE now: the unit of work runs INSERTs before DELETEs
+                # for the same table, which would hit us_unique_constraint
                 db.flush()
             elif existing_us and request.force_action == 'merge':
                 # Merge: Update existing record with new non-null fields
@@ -1191,13 +1247,11 @@ async def confirm_note(
 
                 # Update metadata
                 existing_us.schedatore = note.recorded_by
-                existing_us.data_schedatura = datetime.utcnow().strftime('%Y-%m-%d')
-
-                db.commit()
+                existing_us.data_schedatura = date.today().isoformat()
 
-                # Mark note as validated
+                # Mark note as validated in the same transaction as the merge
                 note.status = 'validated'
-                note.validated_at = datetime.utcnow()
+                note.validated_at = datetime.now(timezone.utc)
                 db.commit()
 
                 return {
@@ -1209,52 +1263,17 @@ async def confirm_note(
             # Check if site exists, create if not
             site = db.query(Site).filter(Site.sito == sito).first()
             if not site:
-                site = Site(sito=sito)
-                db.add(site)
-                db.flush()  # Get the ID
+                # No flush needed: the unit of work inserts the Site before the US at commit
+                db.add(Site(sito=sito))
 
             # Parse and format stratigraphic relationships
             rapporti_raw = extracted_fields.get('rapporti', [])
             rapporti_formatted = format_relationships_for_db(parse_relationships(rapporti_raw))
 
-            # Helper function to convert to list-of-lists format
-            def convert_to_list_of_lists(value):
-                """Convert string or value to list-of-lists format for PyArchInit"""
-                if isinstance(value, str) and value.strip():
-                    # String -> [["String"]]
-                    return [[value.strip()]]
-                elif isinstance(value, list):
-                    if len(value) == 0:
-                        return []
-                    # Already list-of-lists? Return as is
-                    if all(isinstance(item, list) for item in value):
-                        return value
-                    # List of strings -> [["item1"], ["item2"]]
-                    return [[item] for item in value if item]
-                else:
-                    return []
-
-            # Parse other list-of-lists fields (including new ones)
-            inclusi_raw = extracted_fields.get('inclusi', [])
-            campioni_raw = extracted_fields.get('campioni', [])
-            componenti_organici_raw = extracted_fields.get('componenti_organici', [])
-            componenti_inorganici_raw = extracted_fields.get('componenti_inorganici', [])
-            documentazione_raw = extracted_fields.get('documentazione', [])
-
-            # Convert to list-of-lists if needed, then format as JSON
-            inclusi_formatted = format_relationships_for_db(convert_to_list_of_lists(inclusi_raw))
-            campioni_formatted = format_relationships_for_db(convert_to_list_of_lists(campioni_raw))
-            componenti_organici_formatted = format_relationships_for_db(convert_to_list_of_lists(componenti_organici_raw))
-            componenti_inorganici_formatted = format_relationships_for_db(convert_to_list_of_lists(componenti_inorganici_raw))
-            documentazione_formatted = format_relationships_for_db(convert_to_list_of_lists(documentazione_raw))
-
-            print(f"[INCLUSI/CAMPIONI] inclusi_raw: {inclusi_raw!r} (type: {type(inclusi_raw).__name__})")
-            print(f"[INCLUSI/CAMPIONI] inclusi_formatted: {inclusi_formatted!r}")
-            print(f"[INCLUSI/CAMPIONI] campioni_raw: {campioni_raw!r} (type: {type(campioni_raw).__name__})")
-            print(f"[INCLUSI/CAMPIONI] campioni_formatted: {campioni_formatted!r}")
+            # Convert list-of-lists fields (including new ones) and format as JSON
+            list_fields = format_list_fields_for_db(extracted_fields, US_LIST_FIELDS)
 
             # Get valid US model columns
-            from sqlalchemy import inspect
             us_mapper = inspect(US)
             valid_columns = {col.key for col in us_mapper.columns}
 
@@ -1266,13 +1285,9 @@ async def confirm_note(
                 'us': check_us,
                 'unita_tipo': check_tipo,
                 'schedatore': note.recorded_by,
-                'data_schedatura': datetime.utcnow().strftime('%Y-%m-%d'),
+                'data_schedatura': date.today().isoformat(),
                 'rapporti': rapporti_formatted,
-                'inclusi': inclusi_formatted,
-                'campioni': campioni_formatted,
-                'componenti_organici': componenti_organici_formatted,
-                'componenti_inorganici': componenti_inorganici_formatted,
-                'documentazione': documentazione_formatted
+                **list_fields
             }
 
             # Add all other fields from extracted_fields if they exist in the model
@@ -1288,7 +1303,7 @@ async def confirm_note(
 
         # Mark note as validated and saved
         note.status = 'validated'
-        note.validated_at = datetime.utcnow()
+        note.validated_at = datetime.now(timezone.utc)
 
         db.commit()
 
@@ -1315,7 +1330,7 @@ async def reject_note(note_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Note not found")
 
     note.status = 'rejected'
-    note.validated_at = datetime.utcnow()
+    note.validated_at = datetime.now(timezone.utc)
     db.commit()
 
     return {
@@ -106,9 +106,87 @@ def migrate_auth_database(auth_engine):
     for column_name, column_def in columns_to_add:
         add_column_if_missing(auth_engine, 'users', column_name, column_def)
 
+    # Composite indexes for permission checks and default-database lookups
+    create_index_if_missing(
+        auth_engine,
+        'ix_users_role_approval',
+        "CREATE INDEX IF NOT EXISTS ix_users_role_approval ON users (role, approval_status)"
+    )
+    table_names = inspector.get_table_names()
+    if 'project_teams' in table_names:
+        create_index_if_missing(
+            auth_engine,
+            'ix_project_teams_user_project',
+            "CREATE INDEX IF NOT EXISTS ix_project_teams_user_project ON project_teams (user_id, project_id)"
+        )
+    if 'user_databases' in table_names:
+        migrate_user_databases_default(auth_engine)
+
     logger.info("✅ Auth database migration complete")
 
 
+def migrate_user_databases_default(auth_engine):
+    """
+    Enforce at most one default database per user (unique partial index)
+
+    Older databases may hold several is_default rows for the same user: the
+    extra ones (all but the lowest id) are demoted first, otherwise the
+    unique index cannot be built. A failure is logged and does not stop the
+    remaining migrations.
+
+    Args:
+        auth_engine: SQLAlchemy engine for auth database
+    """
+    sqlite = auth_engine.dialect.name == 'sqlite'
+    is_default = "is_default = 1" if sqlite else "is_default"
+    not_default = "0" if sqlite else "FALSE"
+
+    try:
+        with auth_engine.connect() as conn:
+            demoted = conn.execute(text(f"""
+                UPDATE user_databases SET is_default = {not_default}
+                WHERE {is_default}
+                  AND id NOT IN (
+                      SELECT MIN(id) FROM user_databases WHERE {is_default} GROUP BY user_id
+                  )
+            """)).rowcount
+            if demoted:
+                logger.warning(
+                    f"⚠️  Demoted {demoted} duplicate default database(s) in user_databases "
+                    "(kept the oldest default per user)"
+                )
+
+            conn.execute(text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_user_databases_one_default "
+                f"ON user_databases (user_id) WHERE {is_default}"
+            ))
+            # Superseded by the unique partial index above
+            conn.execute(text("DROP INDEX IF EXISTS ix_user_databases_user_default"))
+            conn.commit()
+            logger.info("✅ Index uq_user_databases_one_default ready")
+    except Exception as e:
+        logger.warning(f"⚠️  Could not create uq_user_databases_one_default: {e}")
+
+
+def create_index_if_missing(engine, index_name: str, create_sql: str):
+    """
+    Create an index if it doesn't exist
+
+    Args:
+        engine: SQLAlchemy engine
+        index_name: Name of the index (for logging)
+        create_sql: SQL CREATE INDEX IF NOT EXISTS statement
+    """
+    try:
+        with engine.connect() as conn:
+            conn.execute(text(create_sql))
+            conn.commit()
+            logger.info(f"✅ Index {index_name} ready")
+    except Exception as e:
+        logger.error(f"❌ Failed to create index {index_name}: {e}")
+        raise
+
+
 def create_table_if_missing(engine, table_name: str, create_sql: str):
     """
     Create a table if it doesn't exist
@@ -168,6 +246,19 @@ def migrate_pyarchinit_database(pyarchinit_engine):
         """
     )
 
+    # get_annotations: WHERE media_id = ? ORDER BY created_at DESC, read in index order
+    # (PostgreSQL also carries the selected columns so the scan is index-only)
+    include = (
+        " INCLUDE (id, x, y, width, height, note, color, user_id)"
+        if pyarchinit_engine.dialect.name == 'postgresql' else ""
+    )
+    create_index_if_missing(
+        pyarchinit_engine,
+        'idx_image_annotations_media_created',
+        "CREATE INDEX IF NOT EXISTS idx_image_annotations_media_created "
+        f"ON image_annotations (media_id, created_at DESC){include}"
+    )
+
     # Create mobile_notes table for audio recordings with AI transcription
     create_table_if_missing(
         pyarchinit_engine,
@@ -217,24 +308,32 @@ def run_auto_migrations(auth_engine=None, pyarchinit_engine=None):
     logger.info("🔧 Running automatic database migrations...")
     logger.info("=" * 60)
 
-    try:
-        # Migrate auth database (users, user_databases, etc.)
-        if auth_engine:
-            migrate_auth_database(auth_engine)
-        else:
-            logger.warning("⚠️  Auth engine not provided, skipping auth migrations")
+    # Each database is migrated on its own: a failure in one must not skip the other.
+    # Don't raise - allow app to start even if migrations fail
+    # The error will be logged and the app may fail later with more specific errors
+    failed = False
 
-        # Migrate PyArchInit database (archaeological data)
-        if pyarchinit_engine:
+    # Migrate auth database (users, user_databases, etc.)
+    if auth_engine:
+        try:
+            migrate_auth_database(auth_engine)
+        except Exception as e:
+            failed = True
+            logger.error(f"❌ Auth database migrations failed: {e}")
+    else:
+        logger.warning("⚠️  Auth engine not provided, skipping auth migrations")
+
+    # Migrate PyArchInit database (archaeological data)
+    if pyarchinit_engine:
+        try:
             migrate_pyarchinit_database(pyarchinit_engine)
-        else:
-            logger.warning("⚠️  PyArchInit engine not provided, skipping PyArchInit migrations")
+        except Exception as e:
+            failed = True
+            logger.error(f"❌ PyArchInit database migrations failed: {e}")
+    else:
+        logger.warning("⚠️  PyArchInit engine not provided, skipping PyArchInit migrations")
 
+    if not failed:
         logger.info("=" * 60)
         logger.info("✅ All automatic migrations completed successfully")
         logger.info("=" * 60)
-
-    except Exception as e:
-        logger.error(f"❌ Automatic migrations failed: {e}")
-        # Don't raise - allow app to start even if migrations fail
-        # The error will be logged and the app may fail later with more specific errors
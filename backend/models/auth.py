@@ -11,36 +11,14 @@ Tables in Auth Database:
 - project_collaborators: Project access control (hybrid mode)
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Enum
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
-from datetime import datetime
-import enum
-import os
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Index, UniqueConstraint, text
+from sqlalchemy.orm import deferred, relationship
 
-from backend.models.auth_base import AuthBase
-
-
-class UserRole(str, enum.Enum):
-    """User roles"""
-    ADMIN = "admin"
-    ARCHAEOLOGIST = "archaeologist"
-    STUDENT = "student"
-    VIEWER = "viewer"
-
-
-class ProjectRole(str, enum.Enum):
-    """Project-specific roles"""
-    OWNER = "owner"
-    EDITOR = "editor"
-    CONTRIBUTOR = "contributor"
-    VIEWER = "viewer"
-
-
-# Use String for SQLite compatibility, Enum for PostgreSQL
-USE_SQLITE = os.getenv("USE_SQLITE", "false").lower() == "true"
-RoleColumn = String(50) if USE_SQLITE else Enum(UserRole)
-ProjectRoleColumn = String(50) if USE_SQLITE else Enum(ProjectRole)
+# UserRole/ProjectRole are re-exported for code importing them from backend.models.auth
+from backend.models.auth_base import (  # noqa: F401
+    AuthBase, UserRole, ProjectRole, RoleColumn, CreatedAtDefault, UpdatedAtDefault, role_str
+)
+from backend.services.secret_utils import EncryptedString
 
 
 class User(AuthBase):
@@ -56,7 +34,10 @@ class User(AuthBase):
     - postgres_hybrid: Shared PostgreSQL with RLS (multi-user projects)
     """
     __tablename__ = "users"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Covers the "is there an approved admin?" probe
+        Index("ix_users_role_approval", "role", "approval_status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, nullable=False, index=True)
@@ -65,30 +46,34 @@ class User(AuthBase):
     role = Column(RoleColumn, default="archaeologist")  # Use string default for SQLite compatibility
     is_active = Column(Boolean, default=True)
     approval_status = Column(String(50), default="pending")  # "pending" | "approved" | "rejected"
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), **CreatedAtDefault)
+    updated_at = Column(DateTime(timezone=True), **UpdatedAtDefault)
 
     # Database Mode Configuration
     db_mode = Column(String(50), default="sqlite")  # "sqlite" | "separate" | "hybrid"
 
+    # Connection settings are deferred in the "connection" group: the per-request
+    # user lookup only needs the account columns above
+
     # PostgreSQL connection settings (for separate mode)
-    pg_host = Column(String(255), nullable=True)
-    pg_port = Column(Integer, nullable=True)
-    pg_database = Column(String(255), nullable=True)
-    pg_user = Column(String(255), nullable=True)
-    pg_password = Column(String(255), nullable=True)  # Should be encrypted in production
+    pg_host = deferred(Column(String(255), nullable=True), group="connection")
+    pg_port = deferred(Column(Integer, nullable=True), group="connection")
+    pg_database = deferred(Column(String(255), nullable=True), group="connection")
+    pg_user = deferred(Column(String(255), nullable=True), group="connection")
+    pg_password = deferred(Column(EncryptedString(255), nullable=True), group="connection")  # Stored as Fernet token
 
     # SQLite database path (for personal SQLite mode)
-    sqlite_db_path = Column(String(500), nullable=True)
+    sqlite_db_path = deferred(Column(String(500), nullable=True), group="connection")
 
-    # Relationships
+    # Relationships (lazy: no request reads them; use selectinload() where a
+    # query iterates them over several rows)
     owned_projects = relationship(
-        "backend.models.auth.Project",
+        "Project",
         back_populates="owner",
-        foreign_keys="backend.models.auth.Project.owner_id"
+        foreign_keys="Project.owner_id"
     )
     project_memberships = relationship(
-        "backend.models.auth.ProjectTeam",
+        "ProjectTeam",
         back_populates="user"
     )
 
@@ -104,7 +89,6 @@ class Project(AuthBase):
     Each project has its own database (SQLite or PostgreSQL).
     """
     __tablename__ = "projects"
-    __table_args__ = {'extend_existing': True}
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -117,12 +101,12 @@ class Project(AuthBase):
     is_personal = Column(Boolean, default=False)  # Personal workspace vs shared project
 
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), **CreatedAtDefault)
+    updated_at = Column(DateTime(timezone=True), **UpdatedAtDefault)
 
     # Relationships
-    owner = relationship("backend.models.auth.User", back_populates="owned_projects", foreign_keys=[owner_id])
-    team_members = relationship("backend.models.auth.ProjectTeam", back_populates="project")
+    owner = relationship("User", back_populates="owned_projects", foreign_keys=[owner_id])
+    team_members = relationship("ProjectTeam", back_populates="project")
 
     def __repr__(self):
         return f"<Project(id={self.id}, name='{self.name}', owner_id={self.owner_id}, db_mode='{self.db_mode}')>"
@@ -136,18 +120,22 @@ class ProjectTeam(AuthBase):
     Defines who can access which projects and with what permissions.
     """
     __tablename__ = "project_teams"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        UniqueConstraint("project_id", "user_id", name="uq_project_teams_project_user"),
+        # Permission checks filter on (user_id, project_id)
+        Index("ix_project_teams_user_project", "user_id", "project_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     role = Column(String(20), default="member")  # "owner" | "admin" | "member" | "viewer"
     permissions = Column(String, nullable=True)  # JSON string with granular permissions
-    joined_at = Column(DateTime(timezone=True), server_default=func.now())
+    joined_at = Column(DateTime(timezone=True), **CreatedAtDefault)
 
     # Relationships
-    project = relationship("backend.models.auth.Project", back_populates="team_members")
-    user = relationship("backend.models.auth.User", back_populates="project_memberships")
+    project = relationship("Project", back_populates="team_members")
+    user = relationship("User", back_populates="project_memberships")
 
     def __repr__(self):
         return f"<ProjectTeam(project_id={self.project_id}, user_id={self.user_id}, role={self.role})>"
@@ -167,7 +155,16 @@ class UserDatabase(AuthBase):
     - User 3 → Multiple databases for different projects
     """
     __tablename__ = "user_databases"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Partial unique index: at most one default database per user; also serves
+        # the "default database for user" lookup (only the few default rows are indexed)
+        Index(
+            "uq_user_databases_one_default", "user_id",
+            unique=True,
+            sqlite_where=text("is_default = 1"),
+            postgresql_where=text("is_default")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -184,15 +181,15 @@ class UserDatabase(AuthBase):
     pg_port = Column(Integer, nullable=True)
     pg_database = Column(String(255), nullable=True)
     pg_user = Column(String(255), nullable=True)
-    pg_password = Column(String(255), nullable=True)  # Should be encrypted
+    pg_password = Column(EncryptedString(255), nullable=True)  # Stored as Fernet token
 
     # Flags
     is_active = Column(Boolean, default=True)  # Can be deactivated without deletion
     is_default = Column(Boolean, default=False)  # Default database for this user
 
     # Metadata
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    last_used_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), **CreatedAtDefault)
+    last_used_at = Column(DateTime(timezone=True), **UpdatedAtDefault)
 
     def __repr__(self):
         return f"<UserDatabase(id={self.id}, user_id={self.user_id}, db_name='{self.db_name}', db_type='{self.db_type}')>"
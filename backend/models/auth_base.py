@@ -11,7 +11,67 @@ Auth Database Tables:
 - project_collaborators: Project access control
 """
 
-from sqlalchemy.ext.declarative import declarative_base
+import enum
+import os
+from datetime import datetime, timezone
+
+from sqlalchemy import Enum, String
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.sql import func
 
 # Separate Base for authentication database
 AuthBase = declarative_base()
+
+
+class UserRole(str, enum.Enum):
+    """User roles"""
+    ADMIN = "admin"
+    ARCHAEOLOGIST = "archaeologist"
+    STUDENT = "student"
+    VIEWER = "viewer"
+
+
+class ProjectRole(str, enum.Enum):
+    """Project-specific roles"""
+    OWNER = "owner"
+    EDITOR = "editor"
+    CONTRIBUTOR = "contributor"
+    VIEWER = "viewer"
+
+
+# Column types are resolved once at process start and shared by all models
+# Use String for SQLite compatibility, Enum for PostgreSQL
+USE_SQLITE = os.getenv("USE_SQLITE", "false").lower() == "true"
+# (native PG enum, no CHECK constraint; names match the existing PG types)
+RoleColumn = String(32) if USE_SQLITE else Enum(
+    UserRole, name="userrole", native_enum=True, create_constraint=False, validate_strings=False
+)
+ProjectRoleColumn = String(32) if USE_SQLITE else Enum(
+    ProjectRole, name="projectrole", native_enum=True, create_constraint=False, validate_strings=False
+)
+
+# Role values as plain strings, picked once like the column types above:
+# String columns already return str, Enum columns return UserRole/ProjectRole members
+if USE_SQLITE:
+    def role_str(role):
+        """Role column value as a plain string"""
+        return role
+else:
+    def role_str(role):
+        """Role column value as a plain string"""
+        return role.value if isinstance(role, enum.Enum) else role
+
+
+def utcnow() -> datetime:
+    """Current UTC time, used as client-side timestamp default"""
+    return datetime.now(timezone.utc)
+
+
+# Timestamp defaults: on SQLite compute them in Python so the ORM already holds
+# the value after INSERT/UPDATE (a server default is expired and re-SELECTed on access)
+if USE_SQLITE:
+    CreatedAtDefault = {"default": utcnow}
+    UpdatedAtDefault = {"onupdate": utcnow}
+else:
+    CreatedAtDefault = {"server_default": func.now()}
+    UpdatedAtDefault = {"onupdate": func.now()}
@@ -1,9 +1,8 @@
 from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Float, UniqueConstraint, Index
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import declarative_base, sessionmaker, relationship, deferred
+from sqlalchemy.pool import NullPool
 from datetime import datetime
 from backend.config import settings
-import os
 
 # Connection string PyArchInit
 if settings.USE_SQLITE:
@@ -12,10 +11,24 @@ if settings.USE_SQLITE:
     db_path = "/tmp/pyarchinit_db.sqlite"
     DATABASE_URL = f"sqlite:///{db_path}"
     print(f"[Database] Using SQLite database at: {db_path}")
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    # File-backed SQLite: open a connection per checkout instead of sharing
+    # pooled connections across threads on the single database file
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=NullPool
+    )
 else:
     DATABASE_URL = f"postgresql://{settings.PYARCHINIT_DB_USER}:{settings.PYARCHINIT_DB_PASSWORD}@{settings.PYARCHINIT_DB_HOST}:{settings.PYARCHINIT_DB_PORT}/{settings.PYARCHINIT_DB_NAME}"
-    engine = create_engine(DATABASE_URL)
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        executemany_mode="values_plus_batch",
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT
+    )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
@@ -60,6 +73,10 @@ class US(Base):
     """PyArchInit us_table - Stratigraphic units (US) with full archaeological documentation (134 columns)"""
     __tablename__ = "us_table"
 
+    # Column types mirror the PyArchInit desktop us_table: databases are shared with it,
+    # so keep Text where PyArchInit uses text (in PostgreSQL text and varchar(n) share the
+    # same storage; only values over ~2KB are TOASTed, which short codes never reach)
+
     # Primary key
     id_us = Column(Integer, primary_key=True, autoincrement=True)
 
@@ -72,8 +89,8 @@ class US(Base):
     # Descriptive fields (bilingual: Italian/English)
     d_stratigrafica = Column(String(255))
     d_interpretativa = Column(String(255))
-    descrizione = Column(Text)
-    interpretazione = Column(Text)
+    descrizione = deferred(Column(Text), group="bulk_text")
+    interpretazione = deferred(Column(Text), group="bulk_text")
 
     # Chronology
     periodo_iniziale = Column(String(4))
@@ -89,11 +106,14 @@ class US(Base):
     data_schedatura = Column(String(20))
     schedatore = Column(String(25))
 
+    # Long free-text and list-of-lists fields are deferred in the "bulk_text" group:
+    # loaded together on first access, or up front with undefer_group("bulk_text")
+
     # List-of-lists fields (stored as TEXT, format: [['Type', 'US', 'Area', 'Site'], ...])
-    inclusi = Column(Text)
-    campioni = Column(Text)
-    rapporti = Column(Text)
-    documentazione = Column(Text)
+    inclusi = deferred(Column(Text), group="bulk_text")
+    campioni = deferred(Column(Text), group="bulk_text")
+    rapporti = deferred(Column(Text), group="bulk_text")
+    documentazione = deferred(Column(Text), group="bulk_text")
 
     # Formation and preservation
     formazione = Column(String(20))
@@ -159,14 +179,14 @@ class US(Base):
     ref_n = Column(Text)
 
     # Additional descriptive fields
-    posizione = Column(Text)
-    criteri_distinzione = Column(Text)
-    modo_formazione = Column(Text)
-    componenti_organici = Column(Text)
-    componenti_inorganici = Column(Text)
+    posizione = deferred(Column(Text), group="bulk_text")
+    criteri_distinzione = deferred(Column(Text), group="bulk_text")
+    modo_formazione = deferred(Column(Text), group="bulk_text")
+    componenti_organici = deferred(Column(Text), group="bulk_text")
+    componenti_inorganici = deferred(Column(Text), group="bulk_text")
 
     # Observations
-    osservazioni = Column(Text)
+    osservazioni = deferred(Column(Text), group="bulk_text")
     datazione = Column(Text)
     flottazione = Column(Text)
     setacciatura = Column(Text)
@@ -218,29 +238,29 @@ class US(Base):
     rifinitura_usm = Column(Text)
 
     # Additional relationships
-    rapporti2 = Column(Text)
-    doc_usv = Column(Text)
+    rapporti2 = deferred(Column(Text), group="bulk_text")
+    doc_usv = deferred(Column(Text), group="bulk_text")
 
     # Quantifications
-    quantificazioni = Column(Text)
+    quantificazioni = deferred(Column(Text), group="bulk_text")
     unita_edilizie = Column(Text)
-    organici = Column(Text)
-    inorganici = Column(Text)
+    organici = deferred(Column(Text), group="bulk_text")
+    inorganici = deferred(Column(Text), group="bulk_text")
 
     # English translations
-    d_stratigrafica_en = Column(Text)
-    d_interpretativa_en = Column(Text)
-    descrizione_en = Column(Text)
-    interpretazione_en = Column(Text)
-    formazione_en = Column(Text)
-    stato_di_conservazione_en = Column(Text)
-    colore_en = Column(Text)
-    consistenza_en = Column(Text)
-    struttura_en = Column(Text)
-    inclusi_en = Column(Text)
-    campioni_en = Column(Text)
-    documentazione_en = Column(Text)
-    osservazioni_en = Column(Text)
+    d_stratigrafica_en = deferred(Column(Text), group="bulk_text")
+    d_interpretativa_en = deferred(Column(Text), group="bulk_text")
+    descrizione_en = deferred(Column(Text), group="bulk_text")
+    interpretazione_en = deferred(Column(Text), group="bulk_text")
+    formazione_en = deferred(Column(Text), group="bulk_text")
+    stato_di_conservazione_en = deferred(Column(Text), group="bulk_text")
+    colore_en = deferred(Column(Text), group="bulk_text")
+    consistenza_en = deferred(Column(Text), group="bulk_text")
+    struttura_en = deferred(Column(Text), group="bulk_text")
+    inclusi_en = deferred(Column(Text), group="bulk_text")
+    campioni_en = deferred(Column(Text), group="bulk_text")
+    documentazione_en = deferred(Column(Text), group="bulk_text")
+    osservazioni_en = deferred(Column(Text), group="bulk_text")
 
     # Unique constraint to prevent duplicate US records
     __table_args__ = (
@@ -259,6 +279,8 @@ class US(Base):
 class Media(Base):
     """PyArchInit media_table - Media file management (photos, audio, video, documents)"""
     __tablename__ = "media_table"
+    # Write-heavy: never fetch server-generated defaults back in the INSERT
+    __mapper_args__ = {"eager_defaults": False}
 
     id_media = Column(Integer, primary_key=True, autoincrement=True)
     id_entity = Column(Integer)  # ID of related entity (US, Tomb, etc.)
@@ -303,6 +325,8 @@ class Media(Base):
 class MobileNote(Base):
     """Mobile audio notes table (before validation and database insertion)"""
     __tablename__ = "mobile_notes"
+    # Write-heavy: never fetch server-generated defaults back in the INSERT
+    __mapper_args__ = {"eager_defaults": False}
 
     id = Column(Integer, primary_key=True, autoincrement=True)
 
@@ -441,11 +465,8 @@ class Model3D(Base):
 
 def get_db():
     """Dependency to get database session"""
-    db = SessionLocal()
-    try:
+    with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 def init_db():
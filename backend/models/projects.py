@@ -2,8 +2,8 @@
 Pydantic models for multi-project system
 Handles project creation, team management, and database configuration
 """
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List, Dict
+from pydantic import BaseModel, EmailStr, Field, model_validator, validator
+from typing import Annotated, Optional, List, Dict
 from datetime import datetime
 from enum import Enum
 
@@ -35,17 +35,11 @@ class SQLiteConfig(BaseModel):
 class PostgresConfig(BaseModel):
     """PostgreSQL database configuration"""
     host: str = Field(..., description="PostgreSQL host")
-    port: int = Field(5432, description="PostgreSQL port")
+    port: Annotated[int, Field(ge=1, le=65535, description="PostgreSQL port")] = 5432
     database: str = Field(..., description="Database name")
     user: str = Field(..., description="Database user")
     password: str = Field(..., description="Database password")
 
-    @validator('port')
-    def validate_port(cls, v):
-        if not 1 <= v <= 65535:
-            raise ValueError('Port must be between 1 and 65535')
-        return v
-
 
 # ============================================================================
 # PROJECT MODELS
@@ -61,21 +55,14 @@ class ProjectCreate(BaseModel):
     sqlite_config: Optional[SQLiteConfig] = None
     postgres_config: Optional[PostgresConfig] = None
 
-    @validator('sqlite_config', always=True)
-    def validate_sqlite_config(cls, v, values):
-        """Ensure SQLite config is provided when db_mode is sqlite"""
-        if 'db_mode' in values and values['db_mode'] == DatabaseMode.SQLITE:
-            if not v:
-                raise ValueError('sqlite_config is required when db_mode is sqlite')
-        return v
-
-    @validator('postgres_config', always=True)
-    def validate_postgres_config(cls, v, values):
-        """Ensure PostgreSQL config is provided when db_mode is postgres or hybrid"""
-        if 'db_mode' in values and values['db_mode'] in [DatabaseMode.POSTGRES, DatabaseMode.HYBRID]:
-            if not v:
-                raise ValueError('postgres_config is required when db_mode is postgres or hybrid')
-        return v
+    @model_validator(mode='after')
+    def validate_db_config(self):
+        """Ensure the config matching db_mode is provided"""
+        if self.db_mode == DatabaseMode.SQLITE and not self.sqlite_config:
+            raise ValueError('sqlite_config is required when db_mode is sqlite')
+        if self.db_mode in (DatabaseMode.POSTGRES, DatabaseMode.HYBRID) and not self.postgres_config:
+            raise ValueError('postgres_config is required when db_mode is postgres or hybrid')
+        return self
 
 
 class ProjectUpdate(BaseModel):
@@ -145,7 +132,7 @@ class ProjectListItem(BaseModel):
 
 class AddTeamMemberRequest(BaseModel):
     """Request to add a team member"""
-    email: str = Field(..., description="Email of user to add")
+    email: EmailStr = Field(..., description="Email of user to add")
     role: UserRole = Field(UserRole.MEMBER, description="Role to assign")
     permissions: Optional[ProjectPermissions] = None
 
@@ -1,17 +1,20 @@
 """
 Image Annotations API - Tropy-style image selection and notes
 """
+from dataclasses import dataclass
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import DateTime, text
+from datetime import datetime
 from typing import List, Optional
 
 from backend.services.auth_service import get_current_user
 from backend.services.db_manager import get_db
 from backend.models.auth import User
 
-router = APIRouter(prefix="/api/annotations", tags=["annotations"])
+router = APIRouter(prefix="/api/annotations", tags=["annotations"], default_response_class=ORJSONResponse)
 
 
 class AnnotationCreate(BaseModel):
@@ -34,22 +37,94 @@ class AnnotationResponse(BaseModel):
     note: Optional[str]
     color: str
     user_id: Optional[int]
-    created_at: str
+    created_at: datetime
 
 
-@router.post("/", response_model=AnnotationResponse)
+@dataclass(slots=True, frozen=True)
+class AnnotationRow:
+    """Annotation row as returned by RETURNING (same shape as AnnotationResponse)"""
+    id: int
+    media_id: int
+    x: float
+    y: float
+    width: float
+    height: float
+    note: Optional[str]
+    color: str
+    user_id: Optional[int]
+    created_at: datetime
+
+
+# Statements are built once at import and reused on every request;
+# created_at is typed so the driver value comes back as a datetime
+# RETURNING hands back the stored row, no follow-up SELECT on last_insert_rowid()
+_INSERT_ANNOTATION = text("""
+    INSERT INTO image_annotations (media_id, x, y, width, height, note, color, user_id)
+    VALUES (:media_id, :x, :y, :width, :height, :note, :color, :user_id)
+    RETURNING id, media_id, x, y, width, height, note, color, user_id, created_at
+""").columns(created_at=DateTime)
+
+# The list is encoded to JSON by the database itself: one string per request,
+# no per-row Python objects. Keys mirror AnnotationResponse.
+_SELECT_ANNOTATIONS_JSON = {
+    'sqlite': text("""
+        SELECT json_group_array(json_object(
+            'id', id, 'media_id', media_id, 'x', x, 'y', y,
+            'width', width, 'height', height, 'note', note, 'color', color,
+            'user_id', user_id,
+            'created_at', strftime('%Y-%m-%dT%H:%M:%S', created_at)
+        ))
+        FROM (
+            SELECT * FROM image_annotations
+            WHERE media_id = :media_id
+            ORDER BY created_at DESC
+        )
+    """),
+    'postgresql': text("""
+        SELECT COALESCE(json_agg(json_build_object(
+            'id', id, 'media_id', media_id, 'x', x, 'y', y,
+            'width', width, 'height', height, 'note', note, 'color', color,
+            'user_id', user_id, 'created_at', created_at
+        ) ORDER BY created_at DESC), '[]'::json)::text
+        FROM image_annotations
+        WHERE media_id = :media_id
+    """),
+}
+
+_DELETE_ANNOTATION = text("""
+    DELETE FROM image_annotations
+    WHERE id = :id AND (user_id = :user_id OR :is_admin = 1)
+""")
+
+_UPDATE_ANNOTATION_NOTE = text("""
+    UPDATE image_annotations SET note = :note, updated_at = CURRENT_TIMESTAMP
+    WHERE id = :id AND (user_id = :user_id OR :is_admin = 1)
+""")
+
+_ANNOTATION_EXISTS = text("SELECT 1 FROM image_annotations WHERE id = :id")
+
+
+def _is_admin(user: User) -> int:
+    """1 if user is admin (bound into the ownership predicate), else 0"""
+    return 1 if user.role == 'admin' else 0
+
+
+def _raise_not_found_or_forbidden(db: Session, annotation_id: int):
+    """Called when an owner-filtered DELETE/UPDATE matched nothing"""
+    exists = db.execute(_ANNOTATION_EXISTS, {'id': annotation_id}).first()
+    if not exists:
+        raise HTTPException(status_code=404, detail="Annotation not found")
+    raise HTTPException(status_code=403, detail="Not authorized")
+
+
+@router.post("/", response_model=None, responses={200: {"model": AnnotationResponse}})
 async def create_annotation(
     annotation: AnnotationCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create new image annotation"""
-    query = text("""
-        INSERT INTO image_annotations (media_id, x, y, width, height, note, color, user_id)
-        VALUES (:media_id, :x, :y, :width, :height, :note, :color, :user_id)
-    """)
-
-    db.execute(query, {
+    row = db.execute(_INSERT_ANNOTATION, {
         'media_id': annotation.media_id,
         'x': annotation.x,
         'y': annotation.y,
@@ -58,63 +133,29 @@ async def create_annotation(
         'note': annotation.note,
         'color': annotation.color,
         'user_id': current_user.id
-    })
+    }).mappings().first()
     db.commit()
 
-    # Get created annotation
-    result = db.execute(text("""
-        SELECT id, media_id, x, y, width, height, note, color, user_id,
-               datetime(created_at) as created_at
-        FROM image_annotations
-        WHERE id = last_insert_rowid()
-    """)).fetchone()
-
-    return AnnotationResponse(
-        id=result[0],
-        media_id=result[1],
-        x=result[2],
-        y=result[3],
-        width=result[4],
-        height=result[5],
-        note=result[6],
-        color=result[7],
-        user_id=result[8],
-        created_at=result[9]
-    )
+    # Stored row from RETURNING: no validation needed, orjson encodes the dataclass
+    return ORJSONResponse(AnnotationRow(**row))
 
 
-@router.get("/media/{media_id}", response_model=List[AnnotationResponse])
+# The JSON array is built in SQL and passed through as is; the schema stays in the docs.
+@router.get(
+    "/media/{media_id}",
+    response_model=None,
+    responses={200: {"model": List[AnnotationResponse]}}
+)
 async def get_annotations(
     media_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get all annotations for a media item"""
-    query = text("""
-        SELECT id, media_id, x, y, width, height, note, color, user_id,
-               datetime(created_at) as created_at
-        FROM image_annotations
-        WHERE media_id = :media_id
-        ORDER BY created_at DESC
-    """)
-
-    results = db.execute(query, {'media_id': media_id}).fetchall()
-
-    return [
-        AnnotationResponse(
-            id=row[0],
-            media_id=row[1],
-            x=row[2],
-            y=row[3],
-            width=row[4],
-            height=row[5],
-            note=row[6],
-            color=row[7],
-            user_id=row[8],
-            created_at=row[9]
-        )
-        for row in results
-    ]
+    query = _SELECT_ANNOTATIONS_JSON[db.get_bind().dialect.name]
+    payload = db.execute(query, {'media_id': media_id}).scalar()
+
+    return Response(content=payload, media_type="application/json")
 
 
 @router.delete("/{annotation_id}")
@@ -124,21 +165,16 @@ async def delete_annotation(
     db: Session = Depends(get_db)
 ):
     """Delete annotation"""
-    # Check if annotation belongs to user
-    check = db.execute(
-        text("SELECT user_id FROM image_annotations WHERE id = :id"),
-        {'id': annotation_id}
-    ).fetchone()
-
-    if not check:
-        raise HTTPException(status_code=404, detail="Annotation not found")
-
-    if check[0] != current_user.id and current_user.role != 'admin':
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-    db.execute(text("DELETE FROM image_annotations WHERE id = :id"), {'id': annotation_id})
+    # Ownership check is part of the DELETE itself
+    result = db.execute(
+        _DELETE_ANNOTATION,
+        {'id': annotation_id, 'user_id': current_user.id, 'is_admin': _is_admin(current_user)}
+    )
     db.commit()
 
+    if result.rowcount == 0:
+        _raise_not_found_or_forbidden(db, annotation_id)
+
     return {"message": "Annotation deleted"}
 
 
@@ -150,22 +186,14 @@ async def update_annotation(
     db: Session = Depends(get_db)
 ):
     """Update annotation note"""
-    # Check ownership
-    check = db.execute(
-        text("SELECT user_id FROM image_annotations WHERE id = :id"),
-        {'id': annotation_id}
-    ).fetchone()
-
-    if not check:
-        raise HTTPException(status_code=404, detail="Annotation not found")
-
-    if check[0] != current_user.id and current_user.role != 'admin':
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-    db.execute(
-        text("UPDATE image_annotations SET note = :note, updated_at = CURRENT_TIMESTAMP WHERE id = :id"),
-        {'note': note, 'id': annotation_id}
+    # Ownership check is part of the UPDATE itself
+    result = db.execute(
+        _UPDATE_ANNOTATION_NOTE,
+        {'note': note, 'id': annotation_id, 'user_id': current_user.id, 'is_admin': _is_admin(current_user)}
     )
     db.commit()
 
+    if result.rowcount == 0:
+        _raise_not_found_or_forbidden(db, annotation_id)
+
     return {"message": "Annotation updated"}
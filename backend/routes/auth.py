@@ -11,16 +11,27 @@ Endpoints:
 - GET /api/auth/db-mode - Get current database mode
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+import logging
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
+import orjson
 from pydantic import BaseModel, EmailStr
+from sqlalchemy import bindparam, func, not_, or_, select, text, update
 from sqlalchemy.orm import Session
+from typing import List, Optional
 
-from backend.services.auth_service import AuthService, get_current_user, require_admin
+from backend.services.auth_service import (
+    AuthService, get_current_user, require_admin, invalidate_user_cache, ADMIN_USERS_CACHE_KEY
+)
+from backend.services.response_cache import CACHE_TTL_NORMAL, etag_response, get_cached, set_cached
 from backend.services.dynamic_db_manager import get_auth_db, get_db_manager
-from backend.models.auth import User
+from backend.models.auth import ProjectTeam, User, UserRole, role_str
+
+logger = logging.getLogger(__name__)
 
 
-router = APIRouter(prefix="/api/auth", tags=["auth"])
+router = APIRouter(prefix="/api/auth", tags=["auth"], default_response_class=ORJSONResponse)
 
 
 # ============================================
@@ -71,6 +82,117 @@ class LoginResponse(BaseModel):
     user: UserResponse
 
 
+class BulkUsersRequest(BaseModel):
+    user_ids: List[int]
+
+
+# Statements are built once at import and reused on every request
+_USER_EXISTS = text("SELECT 1 FROM users WHERE id = :user_id")
+
+_SELECT_DB_INFO = text("""
+    WITH my_teams AS (
+        SELECT project_id FROM project_teams WHERE user_id = :user_id
+    )
+    SELECT (SELECT COUNT(*) FROM my_teams) AS project_count,
+           ws.id, ws.name, ws.db_mode
+    FROM (SELECT 1) AS one
+    LEFT JOIN (
+        SELECT p.id, p.name, p.db_mode
+        FROM projects p
+        INNER JOIN my_teams mt ON mt.project_id = p.id
+        WHERE p.is_personal = 1
+        LIMIT 1
+    ) AS ws ON 1 = 1
+""")
+
+_COUNT_USERS = text("SELECT COUNT(*) FROM users")
+
+# Per-user project count as a correlated subquery (covering index lookup on project_teams.user_id)
+_PROJECTS_COUNT = (
+    select(func.count())
+    .where(ProjectTeam.user_id == User.id)
+    .correlate(User)
+    .scalar_subquery()
+    .label("projects_count")
+)
+
+_APPROVED_ADMIN_EXISTS = text("""
+    SELECT 1 FROM users
+    WHERE role = 'admin' AND approval_status = 'approved'
+    LIMIT 1
+""")
+
+_EMERGENCY_APPROVE_FIRST = text("""
+    UPDATE users
+    SET approval_status = 'approved', role = 'admin'
+    WHERE id = 1
+""")
+
+_SELECT_FIRST_USER = text("SELECT id, email, name, role, approval_status FROM users WHERE id = 1")
+
+# Admin user mutations are Core update() constructs: they hit the compiled cache
+# and bind role through RoleColumn (native enum on PostgreSQL). No User objects
+# are loaded in these sessions, so there is nothing to synchronize.
+_NO_SYNC = {"synchronize_session": False}
+
+_APPROVE_USER = (
+    update(User)
+    .where(
+        User.id == bindparam("user_id"),
+        or_(User.approval_status.is_(None), User.approval_status != "approved")
+    )
+    .values(approval_status="approved")
+    .returning(User.id, User.email, User.name)
+    .execution_options(**_NO_SYNC)
+)
+
+_REJECT_USER = (
+    update(User)
+    .where(User.id == bindparam("user_id"))
+    .values(approval_status="rejected")
+    .returning(User.id, User.email, User.name)
+    .execution_options(**_NO_SYNC)
+)
+
+_SET_USER_ROLE = (
+    update(User)
+    .where(User.id == bindparam("user_id"))
+    .values(role=bindparam("role"))
+    .returning(User.id, User.email, User.name)
+    .execution_options(**_NO_SYNC)
+)
+
+_TOGGLE_USER_ACTIVE = (
+    update(User)
+    .where(User.id == bindparam("user_id"))
+    .values(is_active=not_(User.is_active))
+    .returning(User.id, User.email, User.name, User.is_active)
+    .execution_options(**_NO_SYNC)
+)
+
+_BULK_APPROVE_USERS = (
+    update(User)
+    .where(
+        User.id.in_(bindparam("user_ids", expanding=True)),
+        or_(User.approval_status.is_(None), User.approval_status != "approved")
+    )
+    .values(approval_status="approved")
+    .returning(User.id, User.name)
+    .execution_options(**_NO_SYNC)
+)
+
+_BULK_REJECT_USERS = (
+    update(User)
+    .where(
+        User.id.in_(bindparam("user_ids", expanding=True)),
+        User.id != bindparam("admin_id")
+    )
+    .values(approval_status="rejected")
+    .returning(User.id)
+    .execution_options(**_NO_SYNC)
+)
+
+
 # ============================================
 # Endpoints
 # ============================================
@@ -78,6 +200,7 @@ class LoginResponse(BaseModel):
 @router.post("/register")
 async def register(
     request: RegisterRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_auth_db)
 ):
     """
@@ -88,7 +211,7 @@ async def register(
     - Subsequent users require admin approval
     - Returns access token only if approved, otherwise returns pending status
     """
-    # Register user
+    # Register user (flushed only: committed together with the workspace below)
     user = AuthService.register_user(
         email=request.email,
         password=request.password,
@@ -101,6 +224,7 @@ async def register(
 
     # If user is pending approval, don't create workspace yet and don't return token
     if approval_status == 'pending':
+        db.commit()
         return {
             "status": "pending",
             "message": "Registration successful! Your account is pending admin approval.",
@@ -111,15 +235,20 @@ async def register(
             }
         }
 
-    # User is approved (first user), create personal workspace
+    # User is approved (first user), create personal workspace in the same transaction;
+    # the template database copy runs after the response is sent
     try:
         db_manager = get_db_manager()
         project_id = db_manager.create_personal_workspace(
             user_id=user.id,
-            user_name=user.name
+            user_name=user.name,
+            conn=db.connection(),
+            initialize_db=False
         )
+        db.commit()
+        background_tasks.add_task(db_manager.initialize_personal_workspace_db, user.id)
     except Exception as e:
-        # Rollback user creation if workspace creation fails
+        # Rollback removes both the user and the workspace rows
         db.rollback()
         raise HTTPException(
             status_code=500,
@@ -127,30 +256,29 @@ async def register(
         )
 
     # Generate token for approved user
-    # Handle both Enum (PostgreSQL) and String (SQLite) for role
-    role_str = user.role.value if hasattr(user.role, 'value') else user.role
+    role = role_str(user.role)
 
     token = AuthService.create_access_token(
         user_id=user.id,
         email=user.email,
-        role=role_str
+        role=role
     )
 
-    return {
+    return ORJSONResponse({
         "access_token": token,
         "token_type": "bearer",
         "user": {
             "id": user.id,
             "email": user.email,
             "name": user.name,
-            "role": role_str
+            "role": role
         },
         "default_project_id": project_id,
         "message": f"Registration successful! Personal workspace created."
-    }
+    })
 
 
-@router.post("/login", response_model=LoginResponse)
+@router.post("/login", response_model=None, responses={200: {"model": LoginResponse}})
 async def login(
     request: LoginRequest,
     db: Session = Depends(get_auth_db)
@@ -162,33 +290,34 @@ async def login(
     - Verifies credentials
     - Returns access token
     """
-    result = AuthService.login(
+    result = await AuthService.login(
         email=request.email,
         password=request.password,
         db=db
     )
 
-    return result
+    # Built by AuthService, already in shape: skip response_model re-validation
+    return ORJSONResponse(result)
 
 
-@router.get("/me", response_model=UserResponse)
+@router.get("/me", response_model=None, responses={200: {"model": UserResponse}})
 async def get_current_user_info(
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """
     Get current authenticated user information
 
     Requires: Bearer token in Authorization header
+    Honors If-None-Match (ETag over the body)
     """
-    # Handle both Enum (PostgreSQL) and String (SQLite) for role
-    role_str = current_user.role.value if hasattr(current_user.role, 'value') else current_user.role
-
-    return {
+    body = orjson.dumps({
         "id": current_user.id,
         "email": current_user.email,
         "name": current_user.name,
-        "role": role_str
-    }
+        "role": current_user.role  # already a plain string (see get_current_user)
+    })
+    return etag_response(request, body)
 
 
 @router.get("/db-info")
@@ -204,41 +333,24 @@ async def get_database_info(
     - User's project count
     - Personal workspace info
     """
-    from sqlalchemy import text
-
-    # Count user's projects
-    result = db.execute(
-        text("""
-            SELECT COUNT(*)
-            FROM project_teams
-            WHERE user_id = :user_id
-        """),
-        {"user_id": current_user.id}
-    ).scalar()
-
-    project_count = result or 0
-
-    # Get personal workspace
-    personal_workspace = db.execute(
-        text("""
-            SELECT p.id, p.name, p.db_mode
-            FROM projects p
-            INNER JOIN project_teams pt ON p.id = pt.project_id
-            WHERE pt.user_id = :user_id AND p.is_personal = 1
-            LIMIT 1
-        """),
+    # Project count and personal workspace in one round-trip; the LEFT JOIN
+    # keeps the count row even when the user has no personal workspace
+    row = db.execute(
+        _SELECT_DB_INFO,
         {"user_id": current_user.id}
     ).fetchone()
 
+    project_count = row[0] or 0
+
     return {
         "mode": "multi-project",
         "description": "Multi-project system with personal workspace",
         "user_projects_count": project_count,
         "personal_workspace": {
-            "id": personal_workspace[0],
-            "name": personal_workspace[1],
-            "db_mode": personal_workspace[2]
-        } if personal_workspace else None
+            "id": row[1],
+            "name": row[2],
+            "db_mode": row[3]
+        } if row[1] is not None else None
     }
 
 
@@ -248,6 +360,9 @@ async def get_database_info(
 
 @router.get("/admin/users")
 async def get_all_users(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
     admin: User = Depends(require_admin),
     db: Session = Depends(get_auth_db)
 ):
@@ -255,38 +370,53 @@ async def get_all_users(
     Get all users (for admin management)
 
     Requires: Admin role
-    Returns: List of all users with their stats
-    """
-    from sqlalchemy import text
+    Returns: List of all users with their stats ("total" counts all users)
+    Optional ?limit=&offset= return one page ordered by id
 
-    users = db.query(User).all()
+    The full list is cached in Redis for CACHE_TTL_NORMAL seconds; user changes
+    invalidate it, project counts may lag by up to the TTL.
+    Honors If-None-Match (ETag over the body): unchanged lists return 304.
+    """
+    paginated = limit is not None
+
+    if not paginated:
+        cached = get_cached(ADMIN_USERS_CACHE_KEY)
+        if cached is not None:
+            return etag_response(request, cached)
+
+    # Plain rows with just the listed columns plus the project count, in one query:
+    # no ORM objects or identity map, no per-user COUNT
+    query = db.query(
+        User.id, User.email, User.name, User.role,
+        User.is_active, User.approval_status, User.created_at, _PROJECTS_COUNT
+    ).order_by(User.id)
+    if paginated:
+        query = query.limit(limit).offset(offset)
+        total = db.execute(_COUNT_USERS).scalar()
+    users = query.all()
 
     user_list = []
-    for user in users:
-        # Count projects for each user
-        project_count = db.execute(
-            text("SELECT COUNT(*) FROM project_teams WHERE user_id = :user_id"),
-            {"user_id": user.id}
-        ).scalar()
-
-        # Get approval_status with fallback for older records
-        approval_status = getattr(user, 'approval_status', 'approved')
-
+    to_role = role_str  # local name for the loop
+    for user_id, email, name, role, is_active, approval_status, created_at, projects_count in users:
         user_list.append({
-            "id": user.id,
-            "email": user.email,
-            "name": user.name,
-            "role": user.role.value if hasattr(user.role, 'value') else user.role,
-            "is_active": user.is_active,
+            "id": user_id,
+            "email": email,
+            "name": name,
+            "role": to_role(role),
+            "is_active": is_active,
             "approval_status": approval_status,
-            "projects_count": project_count or 0,
-            "created_at": user.created_at.isoformat() if hasattr(user, 'created_at') and user.created_at else None
+            "projects_count": projects_count,
+            "created_at": created_at  # orjson writes datetimes as ISO-8601
         })
 
-    return {
+    body = orjson.dumps({
         "users": user_list,
-        "total": len(user_list)
-    }
+        "total": total if paginated else len(user_list)
+    })
+    if not paginated:
+        set_cached(ADMIN_USERS_CACHE_KEY, body, CACHE_TTL_NORMAL)
+
+    return etag_response(request, body)
 
 
 @router.post("/emergency-approve")
@@ -297,16 +427,8 @@ async def emergency_approve_first_admin(db: Session = Depends(get_auth_db)):
     Use this ONLY when the first admin is stuck in pending status
     Returns success message or error if conditions not met
     """
-    from sqlalchemy import text
-
-    # Check if there are any approved admins
-    approved_admin = db.execute(
-        text("""
-            SELECT id FROM users
-            WHERE role = 'admin' AND approval_status = 'approved'
-            LIMIT 1
-        """)
-    ).fetchone()
+    # Check if there are any approved admins (index-only probe on ix_users_role_approval)
+    approved_admin = db.execute(_APPROVED_ADMIN_EXISTS).scalar()
 
     if approved_admin:
         raise HTTPException(
@@ -315,14 +437,9 @@ async def emergency_approve_first_admin(db: Session = Depends(get_auth_db)):
         )
 
     # Auto-approve the first registered user (ID = 1)
-    result = db.execute(
-        text("""
-            UPDATE users
-            SET approval_status = 'approved', role = 'admin'
-            WHERE id = 1
-        """)
-    )
+    result = db.execute(_EMERGENCY_APPROVE_FIRST)
     db.commit()
+    invalidate_user_cache(1)
 
     if result.rowcount == 0:
         raise HTTPException(
@@ -331,9 +448,7 @@ async def emergency_approve_first_admin(db: Session = Depends(get_auth_db)):
         )
 
     # Get updated user info
-    user = db.execute(
-        text("SELECT id, email, name, role, approval_status FROM users WHERE id = 1")
-    ).fetchone()
+    user = db.execute(_SELECT_FIRST_USER).fetchone()
 
     return {
         "success": True,
@@ -361,24 +476,20 @@ async def approve_user(
     Changes user approval_status from 'pending' to 'approved'
     Creates personal workspace for the approved user
     """
-    from sqlalchemy import text
-
-    # Check if user exists
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    # Update approval status; RETURNING replaces the SELECT beforehand
+    user = db.execute(
+        _APPROVE_USER,
+        {"user_id": user_id}
+    ).fetchone()
+    db.commit()
 
-    # Check if user is already approved
-    current_status = getattr(user, 'approval_status', 'pending')
-    if current_status == 'approved':
+    if user is None:
+        # Nothing updated: either missing or already approved
+        if not db.execute(_USER_EXISTS, {"user_id": user_id}).first():
+            raise HTTPException(status_code=404, detail="User not found")
         raise HTTPException(status_code=400, detail="User is already approved")
 
-    # Update approval status
-    db.execute(
-        text("UPDATE users SET approval_status = 'approved' WHERE id = :user_id"),
-        {"user_id": user_id}
-    )
-    db.commit()
+    invalidate_user_cache(user_id)
 
     # Create personal workspace for the newly approved user
     try:
@@ -389,7 +500,7 @@ async def approve_user(
         )
     except Exception as e:
         # Don't rollback approval, just log the error
-        print(f"Warning: Failed to create workspace for approved user {user.id}: {str(e)}")
+        logger.warning("Failed to create workspace for approved user %s: %s", user.id, e)
         # Continue with approval even if workspace creation fails
 
     return {
@@ -416,24 +527,22 @@ async def reject_user(
     Requires: Admin role
     Changes user approval_status from 'pending' to 'rejected'
     """
-    from sqlalchemy import text
-
-    # Check if user exists
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
     # Cannot reject yourself
-    if user.id == admin.id:
+    if user_id == admin.id:
         raise HTTPException(status_code=400, detail="Cannot reject yourself")
 
-    # Update approval status
-    db.execute(
-        text("UPDATE users SET approval_status = 'rejected' WHERE id = :user_id"),
+    # Update approval status; RETURNING replaces the SELECT beforehand
+    user = db.execute(
+        _REJECT_USER,
         {"user_id": user_id}
-    )
+    ).fetchone()
     db.commit()
 
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    invalidate_user_cache(user_id)
+
     return {
         "success": True,
         "message": f"User {user.email} rejected",
@@ -449,7 +558,7 @@ async def reject_user(
 @router.put("/admin/users/{user_id}/role")
 async def change_user_role(
     user_id: int,
-    role: str,
+    role: UserRole,
     admin: User = Depends(require_admin),
     db: Session = Depends(get_auth_db)
 ):
@@ -458,41 +567,34 @@ async def change_user_role(
 
     Requires: Admin role
     Allowed roles: admin, archaeologist, student, viewer
+    (validated against UserRole before the handler runs; invalid values get 422)
     """
-    from sqlalchemy import text
-
-    # Validate role
-    allowed_roles = ["admin", "archaeologist", "student", "viewer"]
-    if role not in allowed_roles:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid role. Allowed: {', '.join(allowed_roles)}"
-        )
-
-    # Check if user exists
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    new_role = role.value
 
     # Cannot change your own role
-    if user.id == admin.id:
+    if user_id == admin.id:
         raise HTTPException(status_code=400, detail="Cannot change your own role")
 
-    # Update role
-    db.execute(
-        text("UPDATE users SET role = :role WHERE id = :user_id"),
-        {"role": role, "user_id": user_id}
-    )
+    # Update role; RETURNING replaces the SELECT beforehand
+    user = db.execute(
+        _SET_USER_ROLE,
+        {"role": new_role, "user_id": user_id}
+    ).fetchone()
     db.commit()
 
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    invalidate_user_cache(user_id)
+
     return {
         "success": True,
-        "message": f"User {user.email} role changed to {role}",
+        "message": f"User {user.email} role changed to {new_role}",
         "user": {
             "id": user.id,
             "email": user.email,
             "name": user.name,
-            "role": role
+            "role": new_role
         }
     }
 
@@ -509,25 +611,23 @@ async def toggle_user_active(
     Requires: Admin role
     Toggles user's is_active status
     """
-    from sqlalchemy import text
-
-    # Check if user exists
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
     # Cannot deactivate yourself
-    if user.id == admin.id:
+    if user_id == admin.id:
         raise HTTPException(status_code=400, detail="Cannot deactivate yourself")
 
-    # Toggle active status
-    new_status = not user.is_active
-    db.execute(
-        text("UPDATE users SET is_active = :status WHERE id = :user_id"),
-        {"status": new_status, "user_id": user_id}
-    )
+    # Toggle active status in SQL; RETURNING replaces the SELECT beforehand
+    user = db.execute(
+        _TOGGLE_USER_ACTIVE,
+        {"user_id": user_id}
+    ).fetchone()
     db.commit()
 
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    new_status = bool(user.is_active)
+    invalidate_user_cache(user_id)
+
     return {
         "success": True,
         "message": f"User {user.email} {'activated' if new_status else 'deactivated'}",
@@ -538,3 +638,66 @@ async def toggle_user_active(
             "is_active": new_status
         }
     }
+
+
+@router.post("/admin/users/bulk-approve")
+async def bulk_approve_users(
+    request: BulkUsersRequest,
+    admin: User = Depends(require_admin),
+    db: Session = Depends(get_auth_db)
+):
+    """
+    Approve many pending users with a single UPDATE (Admin only)
+
+    Requires: Admin role
+    Users already approved are skipped; a personal workspace is created
+    for each newly approved user
+    """
+    approved = db.execute(
+        _BULK_APPROVE_USERS,
+        {"user_ids": request.user_ids}
+    ).fetchall()
+    db.commit()
+
+    db_manager = get_db_manager()
+    for user_id, user_name in approved:
+        invalidate_user_cache(user_id)
+        try:
+            db_manager.create_personal_workspace(user_id=user_id, user_name=user_name)
+        except Exception as e:
+            # Same policy as approve_user: keep the approval, log the error
+            logger.warning("Failed to create workspace for approved user %s: %s", user_id, e)
+
+    return {
+        "success": True,
+        "updated": len(approved),
+        "user_ids": [row[0] for row in approved]
+    }
+
+
+@router.post("/admin/users/bulk-reject")
+async def bulk_reject_users(
+    request: BulkUsersRequest,
+    admin: User = Depends(require_admin),
+    db: Session = Depends(get_auth_db)
+):
+    """
+    Reject many users with a single UPDATE (Admin only)
+
+    Requires: Admin role
+    The calling admin is never rejected
+    """
+    rejected = db.execute(
+        _BULK_REJECT_USERS,
+        {"user_ids": request.user_ids, "admin_id": admin.id}
+    ).scalars().all()
+    db.commit()
+
+    for user_id in rejected:
+        invalidate_user_cache(user_id)
+
+    return {
+        "success": True,
+        "updated": len(rejected),
+        "user_ids": rejected
+    }
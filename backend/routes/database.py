@@ -7,16 +7,19 @@ from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional
-import shutil
 import os
 
 from backend.services.auth_service import get_current_user
 from backend.models.auth import User
 from backend.services.db_manager import get_db
 from backend.config import settings
+from backend.services.upload_utils import save_upload_file
 
 router = APIRouter(prefix="/api/database", tags=["database"])
 
+# Same path as db_manager, resolved once: settings do not change at runtime
+SQLITE_DB_PATH = settings.SQLITE_DB_PATH or "/tmp/pyarchinit_db.sqlite"
+
 
 class DatabaseConfig(BaseModel):
     mode: str  # "sqlite" | "postgresql"
@@ -36,15 +39,10 @@ async def upload_sqlite(
         if not (file.filename.endswith('.sqlite') or file.filename.endswith('.db')):
             raise HTTPException(status_code=400, detail="File must be .sqlite or .db")
 
-        # Define target path - use same path as db_manager
-        if settings.SQLITE_DB_PATH:
-            db_path = settings.SQLITE_DB_PATH
-        else:
-            db_path = "/tmp/pyarchinit_db.sqlite"
+        db_path = SQLITE_DB_PATH
 
-        # Save uploaded file
-        with open(db_path, 'wb') as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Save uploaded file (streamed in chunks, off the event loop)
+        await save_upload_file(file, db_path)
 
         return {
             "message": "Database SQLite caricato con successo",
@@ -66,14 +64,9 @@ async def test_connection(
     """
     try:
         if config.mode == "sqlite":
-            # Test SQLite connection - use same path as db_manager
-            if settings.SQLITE_DB_PATH:
-                db_path = settings.SQLITE_DB_PATH
-            else:
-                db_path = "/tmp/pyarchinit_db.sqlite"
-
-            if os.path.exists(db_path):
-                return {"message": "Connessione SQLite riuscita", "mode": "sqlite", "path": db_path}
+            # Test SQLite connection
+            if os.path.exists(SQLITE_DB_PATH):
+                return {"message": "Connessione SQLite riuscita", "mode": "sqlite", "path": SQLITE_DB_PATH}
             else:
                 raise HTTPException(status_code=404, detail="Database SQLite non trovato")
 
@@ -121,11 +114,7 @@ async def download_sqlite(
     Download the current SQLite database file
     """
     try:
-        # Use same path as db_manager
-        if settings.SQLITE_DB_PATH:
-            db_path = settings.SQLITE_DB_PATH
-        else:
-            db_path = "/tmp/pyarchinit_db.sqlite"
+        db_path = SQLITE_DB_PATH
 
         if not os.path.exists(db_path):
             raise HTTPException(status_code=404, detail="Database SQLite non trovato")
@@ -2,24 +2,139 @@
 Media capture and management routes
 Handles photo, video, and 3D media upload with entity tagging
 """
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import FileResponse, ORJSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Union
 from pydantic import BaseModel
 from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
+import asyncio
+import logging
 import os
+import re
+import secrets
+import time
 import zipfile
-from io import BytesIO
+import aiofiles
+import orjson
 
+from backend.config import settings
 from backend.services.auth_service import AuthService, get_current_user
 from backend.models.auth import User
-from backend.services.dynamic_db_manager import get_user_workspace_db
+from backend.services.dynamic_db_manager import get_db_manager, get_user_workspace_db
 from backend.services.media_processor import MediaProcessor
+from backend.services.upload_utils import sniff_image_type
 
-router = APIRouter(prefix="/api/media", tags=["media"])
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/media", tags=["media"], default_response_class=ORJSONResponse)
 media_processor = MediaProcessor()
 
+# Entity type -> PyArchInit table (read-only, shared by all handlers)
+ENTITY_TABLES = MappingProxyType({
+    "US": "us_table",
+    "INVENTARIO_MATERIALI": "inventario_materiali_table",
+    "POTTERY": "pottery_table"
+})
+
+ENTITY_DISPLAY_NAMES = MappingProxyType({
+    "US": "Unità Stratigrafica",
+    "INVENTARIO_MATERIALI": "Inventario Materiali",
+    "POTTERY": "Ceramica"
+})
+
+# Entity id lookups used when tagging an upload, compiled once at import:
+# entity type -> (statement, form fields it needs, all non-empty)
+_ENTITY_RESOLVERS = MappingProxyType({
+    "US": (
+        text("SELECT id_us FROM us_table WHERE area = :area AND us = :us LIMIT 1"),
+        ("area", "us")
+    ),
+    "INVENTARIO_MATERIALI": (
+        text(
+            "SELECT id_invmat FROM inventario_materiali_table "
+            "WHERE sito = :sito AND numero_inventario = :numero_inventario LIMIT 1"
+        ),
+        ("sito", "numero_inventario")
+    ),
+    "POTTERY": (
+        text("SELECT id_rep FROM pottery_table WHERE sito = :sito AND area = :area AND us = :us LIMIT 1"),
+        ("sito", "area", "us")
+    ),
+})
+
+# Accepted 3D scan formats
+VALID_3D_EXTENSIONS = frozenset({'.obj', '.ply', '.usdz', '.glb', '.gltf', '.fbx'})
+_VALID_3D_EXTENSIONS_STR = ', '.join(sorted(VALID_3D_EXTENSIONS))
+
+# download_media looks the media up in every project database
+_SELECT_PROJECT_IDS = text("SELECT id FROM projects")
+
+# Workspace media list with thumb paths, encoded to a JSON array by the
+# database itself: one string per request instead of a tuple and a dict per row
+_SELECT_MY_MEDIA_JSON = {
+    'sqlite': text("""
+        SELECT json_group_array(json_object(
+            'id_media', id_media, 'media_type', mediatype, 'filename', filename,
+            'filetype', filetype, 'filepath', filepath, 'description', description,
+            'thumb_path', thumb_path, 'resize_path', resize_path
+        ))
+        FROM (
+            SELECT
+                m.id_media, m.mediatype, m.filename, m.filetype, m.filepath,
+                m.descrizione AS description,
+                mt.filepath AS thumb_path,
+                mt.path_resize AS resize_path
+            FROM media_table m
+            LEFT JOIN media_thumb_table mt ON m.id_media = mt.id_media
+            ORDER BY m.id_media DESC
+        )
+    """),
+    'postgresql': text("""
+        SELECT COALESCE(json_agg(json_build_object(
+            'id_media', m.id_media, 'media_type', m.mediatype, 'filename', m.filename,
+            'filetype', m.filetype, 'filepath', m.filepath, 'description', m.descrizione,
+            'thumb_path', mt.filepath, 'resize_path', mt.path_resize
+        ) ORDER BY m.id_media DESC), '[]'::json)::text
+        FROM media_table m
+        LEFT JOIN media_thumb_table mt ON m.id_media = mt.id_media
+    """),
+}
+
+# Media filetype -> MIME type for downloads
+MIME_TYPE_MAP = {
+    "gltf": "model/gltf+json",
+    "glb": "model/gltf-binary",
+    "usdz": "model/vnd.usdz+zip",
+    "obj": "model/obj",
+    "stl": "model/stl",
+    "ply": "model/ply",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "mp4": "video/mp4",
+    "webm": "video/webm",
+    "mov": "video/quicktime",
+    "avi": "video/x-msvideo"
+}
+
+
+@lru_cache(maxsize=256)
+def _resolve_mime_type(filetype: Optional[str], mediatype: Optional[str]) -> str:
+    """MIME type for a stored media filetype/mediatype pair (few distinct pairs, so cached)"""
+    filetype = filetype.lower() if filetype else ""
+    mediatype = mediatype.lower() if mediatype else ""
+    if not filetype:
+        return "application/octet-stream"
+    # Try to get MIME type from extension, fallback to constructed type
+    return MIME_TYPE_MAP.get(filetype, f"{mediatype}/{filetype}")
+
 
 # Pydantic models for request/response
 class MediaTagRequest(BaseModel):
@@ -44,26 +159,21 @@ class EntityTypeInfo(BaseModel):
     display_name: str
 
 
-@router.get("/entity-types", response_model=List[EntityTypeInfo])
+# Static list, serialized once at import
+_ENTITY_TYPES_JSON = orjson.dumps([
+    {
+        "entity_type": entity_type,
+        "table_name": table_name,
+        "display_name": ENTITY_DISPLAY_NAMES[entity_type]
+    }
+    for entity_type, table_name in ENTITY_TABLES.items()
+])
+
+
+@router.get("/entity-types", response_model=None, responses={200: {"model": List[EntityTypeInfo]}})
 async def get_entity_types():
     """Get list of available entity types for media tagging"""
-    return [
-        {
-            "entity_type": "US",
-            "table_name": "us_table",
-            "display_name": "Unità Stratigrafica"
-        },
-        {
-            "entity_type": "INVENTARIO_MATERIALI",
-            "table_name": "inventario_materiali_table",
-            "display_name": "Inventario Materiali"
-        },
-        {
-            "entity_type": "POTTERY",
-            "table_name": "pottery_table",
-            "display_name": "Ceramica"
-        }
-    ]
+    return Response(content=_ENTITY_TYPES_JSON, media_type="application/json")
 
 
 @router.post("/upload-photo", response_model=MediaUploadResponse)
@@ -88,94 +198,66 @@ async def upload_photo(
     - Resized version (800x600)
     """
     try:
-        # Validate file type
+        # Validate file type: cheap header check, then the actual bytes
         if not file.content_type or not file.content_type.startswith('image/'):
             raise HTTPException(status_code=400, detail="File must be an image")
+        if not await sniff_image_type(file):
+            raise HTTPException(status_code=400, detail="File must be an image")
 
-        # Read file content
-        content = await file.read()
-
-        # Process image (create original, thumb, resize)
-        processed = await media_processor.process_image(
-            content=content,
-            original_filename=file.filename,
-            sito=sito or "default",
-            entity_type=entity_type,
-            entity_id=entity_id,
-            user_id=current_user.id
-        )
-
-        # Insert into media_table
-        media_id = media_processor.insert_media_record(
-            db=db,
-            mediatype="image",
-            filename=processed['filename'],
-            filetype=processed['filetype'],
-            filepath=processed['filepath'],
-            description=description,
-            user_id=current_user.id
-        )
-
-        # Insert into media_thumb_table
-        media_processor.insert_media_thumb_record(
-            db=db,
-            media_id=media_id,
-            mediatype="image",
-            filename=processed['filename'],
-            filename_thumb=processed['thumb_filename'],
-            filetype=processed['filetype'],
-            filepath_thumb=processed['thumb_path'],
-            filepath_resize=processed['resize_path']
+        # Process image (create original, thumb, resize) while the entity to tag
+        # is looked up: both run in the threadpool, the DB round trip overlaps Pillow.
+        # return_exceptions: both finish before the session can be released
+        processed, resolved_entity_id = await asyncio.gather(
+            media_processor.process_image(
+                upload=file,
+                original_filename=file.filename,
+                sito=sito or "default",
+                entity_type=entity_type,
+                entity_id=entity_id,
+                user_id=current_user.id
+            ),
+            run_in_threadpool(
+                _resolve_entity_id, db, entity_type, entity_id,
+                {"sito": sito, "area": area, "us": us, "numero_inventario": numero_inventario}
+            ),
+            return_exceptions=True
         )
-
-        # Tag to entity if provided
-        entity_tagged = False
-        if entity_type:
-            from sqlalchemy import text
-
-            table_mapping = {
-                "US": "us_table",
-                "INVENTARIO_MATERIALI": "inventario_materiali_table",
-                "POTTERY": "pottery_table"
+        for outcome in (processed, resolved_entity_id):
+            if isinstance(outcome, BaseException):
+                raise outcome
+
+        entity_link = None
+        if resolved_entity_id:
+            entity_link = {
+                'id_entity': resolved_entity_id,
+                'entity_type': entity_type,
+                'table_name': ENTITY_TABLES[entity_type],
+                'filepath': processed['filepath'],
+                'media_name': processed['filename']
             }
 
-            if entity_type in table_mapping:
-                # Find entity_id based on provided fields
-                resolved_entity_id = None
-
-                if entity_type == "US" and area and us:
-                    query = text("SELECT id_us FROM us_table WHERE area = :area AND us = :us LIMIT 1")
-                    result = db.execute(query, {"area": area, "us": us}).fetchone()
-                    if result:
-                        resolved_entity_id = result[0]
-
-                elif entity_type == "INVENTARIO_MATERIALI" and sito and numero_inventario:
-                    query = text("SELECT id_invmat FROM inventario_materiali_table WHERE sito = :sito AND numero_inventario = :numero_inventario LIMIT 1")
-                    result = db.execute(query, {"sito": sito, "numero_inventario": numero_inventario}).fetchone()
-                    if result:
-                        resolved_entity_id = result[0]
-
-                elif entity_type == "POTTERY" and sito and area and us:
-                    query = text("SELECT id_rep FROM pottery_table WHERE sito = :sito AND area = :area AND us = :us LIMIT 1")
-                    result = db.execute(query, {"sito": sito, "area": area, "us": us}).fetchone()
-                    if result:
-                        resolved_entity_id = result[0]
-
-                # Use entity_id if provided directly (backward compatibility)
-                if not resolved_entity_id and entity_id:
-                    resolved_entity_id = entity_id
-
-                if resolved_entity_id:
-                    media_processor.insert_media_to_entity_record(
-                        db=db,
-                        id_entity=resolved_entity_id,
-                        entity_type=entity_type,
-                        table_name=table_mapping[entity_type],
-                        id_media=media_id,
-                        filepath=processed['filepath'],
-                        media_name=processed['filename']
-                    )
-                    entity_tagged = True
+        # Insert media_table, media_thumb_table and entity link in one transaction
+        media_id = media_processor.insert_media_bundle(
+            db,
+            media={
+                'mediatype': "image",
+                'filename': processed['filename'],
+                'filetype': processed['filetype'],
+                'filepath': processed['filepath'],
+                'description': description,
+                'user_id': current_user.id
+            },
+            thumb={
+                'mediatype': "image",
+                'filename': processed['filename'],
+                'filename_thumb': processed['thumb_filename'],
+                'filetype': processed['filetype'],
+                'filepath_thumb': processed['thumb_path'],
+                'filepath_resize': processed['resize_path']
+            },
+            entity_link=entity_link
+        )
+        entity_tagged = entity_link is not None
 
         return MediaUploadResponse(
             id_media=media_id,
@@ -187,10 +269,77 @@ async def upload_photo(
             entity_tagged=entity_tagged
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error uploading photo: {str(e)}")
 
 
+def _resolve_entity_id(
+    db: Session,
+    entity_type: Optional[str],
+    entity_id: Optional[int],
+    form: dict
+) -> Optional[int]:
+    """Id of the entity a photo is tagged to, found from its form fields (or entity_id)"""
+    if entity_type not in ENTITY_TABLES:
+        return None
+
+    # Find entity_id based on provided fields
+    resolved_entity_id = None
+    stmt, fields = _ENTITY_RESOLVERS[entity_type]
+    params = {field: form[field] for field in fields}
+    if all(params.values()):
+        resolved_entity_id = db.execute(stmt, params).scalar()
+
+    # Use entity_id if provided directly (backward compatibility)
+    return resolved_entity_id or entity_id
+
+
+def _save_media_record(
+    db: Session,
+    processed: dict,
+    mediatype: str,
+    description: Optional[str],
+    entity_type: Optional[str],
+    entity_id: Optional[int],
+    user_id: int
+) -> MediaUploadResponse:
+    """Insert a saved video/3D file (and its entity link, if any) and build the upload response"""
+    # Entity link, if provided
+    entity_link = None
+    if entity_type and entity_id and entity_type in ENTITY_TABLES:
+        entity_link = {
+            'id_entity': entity_id,
+            'entity_type': entity_type,
+            'table_name': ENTITY_TABLES[entity_type],
+            'filepath': processed['filepath'],
+            'media_name': processed['filename']
+        }
+
+    # Insert media_table and entity link in one transaction
+    media_id = media_processor.insert_media_bundle(
+        db,
+        media={
+            'mediatype': mediatype,
+            'filename': processed['filename'],
+            'filetype': processed['filetype'],
+            'filepath': processed['filepath'],
+            'description': description,
+            'user_id': user_id
+        },
+        entity_link=entity_link
+    )
+
+    return MediaUploadResponse(
+        id_media=media_id,
+        filename=processed['filename'],
+        media_type=mediatype,
+        filepath=processed['filepath'],
+        entity_tagged=entity_link is not None
+    )
+
+
 @router.post("/upload-video", response_model=MediaUploadResponse)
 async def upload_video(
     file: UploadFile = File(...),
@@ -209,12 +358,9 @@ async def upload_video(
         if not file.content_type or not file.content_type.startswith('video/'):
             raise HTTPException(status_code=400, detail="File must be a video")
 
-        # Read file content
-        content = await file.read()
-
         # Process video
         processed = await media_processor.process_video(
-            content=content,
+            upload=file,
             original_filename=file.filename,
             sito=sito or "default",
             entity_type=entity_type,
@@ -222,46 +368,14 @@ async def upload_video(
             user_id=current_user.id
         )
 
-        # Insert into media_table
-        media_id = media_processor.insert_media_record(
-            db=db,
-            mediatype="video",
-            filename=processed['filename'],
-            filetype=processed['filetype'],
-            filepath=processed['filepath'],
+        return _save_media_record(
+            db, processed, "video",
             description=description,
+            entity_type=entity_type,
+            entity_id=entity_id,
             user_id=current_user.id
         )
 
-        # Tag to entity if provided
-        entity_tagged = False
-        if entity_type and entity_id:
-            table_mapping = {
-                "US": "us_table",
-                "INVENTARIO_MATERIALI": "inventario_materiali_table",
-                "POTTERY": "pottery_table"
-            }
-
-            if entity_type in table_mapping:
-                media_processor.insert_media_to_entity_record(
-                    db=db,
-                    id_entity=entity_id,
-                    entity_type=entity_type,
-                    table_name=table_mapping[entity_type],
-                    id_media=media_id,
-                    filepath=processed['filepath'],
-                    media_name=processed['filename']
-                )
-                entity_tagged = True
-
-        return MediaUploadResponse(
-            id_media=media_id,
-            filename=processed['filename'],
-            media_type="video",
-            filepath=processed['filepath'],
-            entity_tagged=entity_tagged
-        )
-
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error uploading video: {str(e)}")
 
@@ -283,21 +397,17 @@ async def upload_3d_scan(
     """
     try:
         # Validate file type for 3D models
-        valid_extensions = ['.obj', '.ply', '.usdz', '.glb', '.gltf', '.fbx']
-        file_ext = file.filename[file.filename.rfind('.'):].lower() if '.' in file.filename else ''
+        file_ext = os.path.splitext(file.filename or "")[1].lower()
 
-        if file_ext not in valid_extensions:
+        if file_ext not in VALID_3D_EXTENSIONS:
             raise HTTPException(
                 status_code=400,
-                detail=f"File must be a 3D model. Supported formats: {', '.join(valid_extensions)}"
+                detail=f"File must be a 3D model. Supported formats: {_VALID_3D_EXTENSIONS_STR}"
             )
 
-        # Read file content
-        content = await file.read()
-
         # Process 3D file
         processed = await media_processor.process_3d_model(
-            content=content,
+            upload=file,
             original_filename=file.filename,
             sito=sito or "default",
             entity_type=entity_type,
@@ -306,48 +416,262 @@ async def upload_3d_scan(
             scan_type=scan_type
         )
 
-        # Insert into media_table
-        media_id = media_processor.insert_media_record(
-            db=db,
-            mediatype="3d_model",
-            filename=processed['filename'],
-            filetype=processed['filetype'],
-            filepath=processed['filepath'],
+        return _save_media_record(
+            db, processed, "3d_model",
             description=f"{scan_type.upper()}: {description}" if description else scan_type.upper(),
+            entity_type=entity_type,
+            entity_id=entity_id,
             user_id=current_user.id
         )
 
-        # Tag to entity if provided
-        entity_tagged = False
-        if entity_type and entity_id:
-            table_mapping = {
-                "US": "us_table",
-                "INVENTARIO_MATERIALI": "inventario_materiali_table",
-                "POTTERY": "pottery_table"
-            }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error uploading 3D scan: {str(e)}")
 
-            if entity_type in table_mapping:
-                media_processor.insert_media_to_entity_record(
-                    db=db,
-                    id_entity=entity_id,
-                    entity_type=entity_type,
-                    table_name=table_mapping[entity_type],
-                    id_media=media_id,
-                    filepath=processed['filepath'],
-                    media_name=processed['filename']
-                )
-                entity_tagged = True
 
-        return MediaUploadResponse(
-            id_media=media_id,
-            filename=processed['filename'],
-            media_type="3d_model",
-            filepath=processed['filepath'],
-            entity_tagged=entity_tagged
+# ============================================
+# Resumable uploads (large videos / 3D scans)
+# ============================================
+#
+# 1. POST  /upload-init          -> upload_id
+# 2. PATCH /upload/{upload_id}   body = one chunk, "Content-Range: bytes X-Y/TOTAL"
+#    (repeat; after a failure GET /upload/{upload_id} tells where to resume)
+# 3. The chunk that completes the file saves the media record, like /upload-video
+#    and /upload-3d, and returns MediaUploadResponse
+
+class UploadInitRequest(BaseModel):
+    filename: str
+    size: int
+    media_type: str  # "video" | "3d_model"
+    entity_type: Optional[str] = None
+    entity_id: Optional[int] = None
+    sito: Optional[str] = None
+    description: Optional[str] = None
+    scan_type: str = "lidar"  # 3D only: "lidar" | "photogrammetry"
+
+
+class UploadStatusResponse(BaseModel):
+    upload_id: str
+    offset: int
+    size: int
+
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+
+def _upload_paths(upload_id: str) -> tuple:
+    """(data, metadata) paths of a resumable upload
+
+    Kept under the media root so the finished file is moved into place with a
+    rename; dot-prefixed so the ZIP export skips them.
+    """
+    upload_dir = os.path.join(settings.PYARCHINIT_MEDIA_ROOT, ".uploads")
+    return (
+        os.path.join(upload_dir, f".{upload_id}.part"),
+        os.path.join(upload_dir, f".{upload_id}.json")
+    )
+
+
+def _discard_upload(upload_id: str) -> None:
+    """Remove both files of a resumable upload, whatever is left of them"""
+    for path in _upload_paths(upload_id):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _purge_stale_uploads() -> None:
+    """Remove uploads idle for more than RESUMABLE_UPLOAD_TTL (blocking: run in threadpool)"""
+    upload_dir = os.path.dirname(_upload_paths("x")[0])
+    cutoff = time.time() - settings.RESUMABLE_UPLOAD_TTL
+    try:
+        with os.scandir(upload_dir) as it:
+            names = [entry.name for entry in it]
+    except FileNotFoundError:
+        return
+
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        upload_id = name[1:-len(".json")]
+        data_path, meta_path = _upload_paths(upload_id)
+        try:
+            # Last activity: last chunk written (or creation, if the data is gone)
+            last_activity = os.stat(data_path if os.path.exists(data_path) else meta_path).st_mtime
+        except FileNotFoundError:
+            continue
+        if last_activity < cutoff:
+            _discard_upload(upload_id)
+
+
+def _load_upload(upload_id: str, user_id: int) -> tuple:
+    """
+    (metadata, current offset) of a live resumable upload owned by user_id
+
+    Missing, foreign, expired or half-removed sessions are 404; the last two
+    are cleaned up on the way.
+    """
+    if not upload_id.isalnum():
+        raise HTTPException(status_code=404, detail="Upload not found")
+    data_path, meta_path = _upload_paths(upload_id)
+    try:
+        with open(meta_path, 'rb') as f:
+            meta = orjson.loads(f.read())
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    if meta['user_id'] != user_id:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    try:
+        st = os.stat(data_path)
+    except FileNotFoundError:
+        # Data already moved/removed (e.g. completion failed): stale session
+        _discard_upload(upload_id)
+        raise HTTPException(status_code=404, detail="Upload not found")
+    if st.st_mtime < time.time() - settings.RESUMABLE_UPLOAD_TTL:
+        _discard_upload(upload_id)
+        raise HTTPException(status_code=404, detail="Upload expired")
+
+    return meta, st.st_size
+
+
+@router.post("/upload-init", response_model=UploadStatusResponse)
+async def init_resumable_upload(
+    upload: UploadInitRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Start a resumable upload for a large video or 3D scan"""
+    if upload.media_type not in ("video", "3d_model"):
+        raise HTTPException(status_code=400, detail="media_type must be 'video' or '3d_model'")
+    if upload.size <= 0:
+        raise HTTPException(status_code=400, detail="size must be positive")
+    if upload.size > settings.MAX_RESUMABLE_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum {settings.MAX_RESUMABLE_UPLOAD_SIZE / (1024 * 1024):.0f}MB"
         )
+    if upload.media_type == "3d_model":
+        file_ext = os.path.splitext(upload.filename)[1].lower()
+        if file_ext not in VALID_3D_EXTENSIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File must be a 3D model. Supported formats: {_VALID_3D_EXTENSIONS_STR}"
+            )
+
+    # Abandoned sessions are cleaned up when new ones start
+    await run_in_threadpool(_purge_stale_uploads)
+
+    upload_id = secrets.token_hex(16)
+    data_path, meta_path = _upload_paths(upload_id)
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+
+    open(data_path, 'wb').close()
+    with open(meta_path, 'wb') as f:
+        f.write(orjson.dumps({**upload.model_dump(), 'user_id': current_user.id}))
+
+    return UploadStatusResponse(upload_id=upload_id, offset=0, size=upload.size)
+
+
+@router.get("/upload/{upload_id}", response_model=UploadStatusResponse)
+async def get_resumable_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Bytes received so far: the offset to resume from"""
+    meta, offset = _load_upload(upload_id, current_user.id)
+    return UploadStatusResponse(upload_id=upload_id, offset=offset, size=meta['size'])
+
+
+@router.patch(
+    "/upload/{upload_id}",
+    response_model=None,
+    responses={200: {"model": Union[MediaUploadResponse, UploadStatusResponse]}}
+)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_user_workspace_db)
+):
+    """
+    Receive one chunk of a resumable upload
+
+    Chunks are written in order: the chunk must start at the current offset
+    (409 with the offset to resume from otherwise). The request body is
+    streamed to disk, never held in memory.
+    """
+    meta, offset = _load_upload(upload_id, current_user.id)
+    data_path, meta_path = _upload_paths(upload_id)
+
+    match = _CONTENT_RANGE.fullmatch(request.headers.get("content-range", ""))
+    if not match:
+        raise HTTPException(status_code=400, detail="Content-Range: bytes START-END/TOTAL required")
+    start, end, total = (int(g) for g in match.groups())
+    if total != meta['size'] or end < start or end >= total:
+        raise HTTPException(status_code=400, detail="Invalid Content-Range")
+
+    if start != offset:
+        raise HTTPException(status_code=409, detail={"message": "Chunk out of order", "offset": offset})
+
+    written = 0
+    limit = end - start + 1
+    async with aiofiles.open(data_path, 'r+b') as out:
+        await out.seek(start)
+        async for chunk in request.stream():
+            chunk = chunk[:limit - written]
+            await out.write(chunk)
+            written += len(chunk)
+            if written >= limit:
+                break
+        # A short (interrupted) chunk is kept: the client resumes from the new offset
+        await out.truncate(start + written)
+
+    offset = start + written
+    if offset < total:
+        return UploadStatusResponse(upload_id=upload_id, offset=offset, size=total)
+
+    # Complete: move the file into place and save the media record
+    try:
+        sito = meta['sito'] or "default"
+        if meta['media_type'] == "video":
+            processed = await media_processor.process_video(
+                upload=None,
+                original_filename=meta['filename'],
+                sito=sito,
+                entity_type=meta['entity_type'],
+                entity_id=meta['entity_id'],
+                user_id=current_user.id,
+                source_path=data_path
+            )
+            description = meta['description']
+        else:
+            scan_type = meta['scan_type']
+            processed = await media_processor.process_3d_model(
+                upload=None,
+                original_filename=meta['filename'],
+                sito=sito,
+                entity_type=meta['entity_type'],
+                entity_id=meta['entity_id'],
+                user_id=current_user.id,
+                scan_type=scan_type,
+                source_path=data_path
+            )
+            description = f"{scan_type.upper()}: {meta['description']}" if meta['description'] else scan_type.upper()
 
+        response = _save_media_record(
+            db, processed, meta['media_type'],
+            description=description,
+            entity_type=meta['entity_type'],
+            entity_id=meta['entity_id'],
+            user_id=current_user.id
+        )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error uploading 3D scan: {str(e)}")
+        # The session cannot be resumed (all bytes were received): drop what is left
+        _discard_upload(upload_id)
+        raise HTTPException(status_code=500, detail=f"Error completing upload: {str(e)}")
+
+    _discard_upload(upload_id)
+    return response
 
 
 @router.get("/my-media")
@@ -360,42 +684,10 @@ async def get_my_media(
     Returns list of media with thumbnails and metadata
     """
     try:
-        from sqlalchemy import text
+        query = _SELECT_MY_MEDIA_JSON[db.get_bind().dialect.name]
+        payload = db.execute(query).scalar()
 
-        # Query to get all media for current user
-        # Join with media_thumb_table to get thumb paths
-        query = text("""
-            SELECT
-                m.id_media,
-                m.mediatype,
-                m.filename,
-                m.filetype,
-                m.filepath,
-                m.descrizione as description,
-                mt.filepath as thumb_path,
-                mt.path_resize as resize_path
-            FROM media_table m
-            LEFT JOIN media_thumb_table mt ON m.id_media = mt.id_media
-            ORDER BY m.id_media DESC
-        """)
-
-        result = db.execute(query).fetchall()
-
-        # Convert to list of dictionaries
-        media_list = []
-        for row in result:
-            media_list.append({
-                'id_media': row[0],
-                'media_type': row[1],
-                'filename': row[2],
-                'filetype': row[3],
-                'filepath': row[4],
-                'description': row[5],
-                'thumb_path': row[6],
-                'resize_path': row[7]
-            })
-
-        return media_list
+        return Response(content=payload, media_type="application/json")
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting media: {str(e)}")
@@ -404,19 +696,18 @@ async def get_my_media(
 @router.get("/download/{media_id}/{size}")
 async def download_media(
     media_id: int,
+    request: Request,
     size: str = "original",  # "original" | "thumb" | "resize"
 ):
     """
     Download media file in specified size
     Returns file with relative path compatibility for pyArchInit
     No authentication required - media is public once uploaded
+
+    Honours single "Range: bytes=..." requests (206) so video and 3D viewers
+    can seek without fetching the whole file
     """
     try:
-        from fastapi.responses import FileResponse
-        import os
-        from backend.services.dynamic_db_manager import get_db_manager
-        from sqlalchemy.orm import Session
-
         # Search across all project databases to find the media
         # This is necessary because media can belong to any project
         db_manager = get_db_manager()
@@ -424,8 +715,7 @@ async def download_media(
         # Get auth database to find all projects
         auth_engine = db_manager.get_auth_db()
         with auth_engine.connect() as auth_conn:
-            from sqlalchemy import text
-            projects = auth_conn.execute(text("SELECT id FROM projects")).fetchall()
+            projects = auth_conn.execute(_SELECT_PROJECT_IDS).fetchall()
 
         media_record = None
         project_db_session = None
@@ -437,8 +727,8 @@ async def download_media(
                 project_engine = db_manager.get_project_db(project_id)
                 project_db_session = Session(project_engine)
 
-                # Try to find media in this project's database
-                media_record = media_processor.get_media_by_id(project_db_session, media_id)
+                # Try to find media (and its thumb/resize paths) in this project's database
+                media_record = media_processor.get_media_download_info(project_db_session, media_id)
 
                 if media_record:
                     # Found it! Break out of loop
@@ -458,65 +748,51 @@ async def download_media(
         if not media_record:
             raise HTTPException(status_code=404, detail="Media not found")
 
+        # Everything needed is in media_record: close database session now
+        if project_db_session:
+            project_db_session.close()
+
         # Determine file path based on size
         if size == "thumb":
-            thumb_record = media_processor.get_media_thumb_by_media_id(project_db_session, media_id)
-            if not thumb_record:
-                if project_db_session:
-                    project_db_session.close()
+            filepath = media_record['thumb_filepath']
+            if not filepath:
                 raise HTTPException(status_code=404, detail="Thumbnail not found")
-            filepath = thumb_record['filepath']
         elif size == "resize":
-            thumb_record = media_processor.get_media_thumb_by_media_id(project_db_session, media_id)
-            if not thumb_record:
-                if project_db_session:
-                    project_db_session.close()
+            filepath = media_record['path_resize']
+            if not filepath:
                 raise HTTPException(status_code=404, detail="Resized image not found")
-            filepath = thumb_record['path_resize']
         else:  # original
             filepath = media_record['filepath']
 
-        # Check if file exists
-        if not os.path.exists(filepath):
-            if project_db_session:
-                project_db_session.close()
+        # Single stat: existence check, and reused by FileResponse
+        try:
+            stat_result = os.stat(filepath)
+        except FileNotFoundError:
             raise HTTPException(status_code=404, detail="File not found on disk")
 
         # Determine proper MIME type
-        # Access columns by name using dictionary-style access
-        filetype = media_record['filetype'].lower() if media_record['filetype'] else ""
-        mediatype = media_record['mediatype'].lower() if media_record['mediatype'] else ""
-
-        # Map to proper MIME types
-        mime_type_map = {
-            "gltf": "model/gltf+json",
-            "glb": "model/gltf-binary",
-            "usdz": "model/vnd.usdz+zip",
-            "obj": "model/obj",
-            "stl": "model/stl",
-            "ply": "model/ply",
-            "jpg": "image/jpeg",
-            "jpeg": "image/jpeg",
-            "png": "image/png",
-            "gif": "image/gif",
-            "webp": "image/webp",
-            "mp4": "video/mp4",
-            "webm": "video/webm",
-            "mov": "video/quicktime",
-            "avi": "video/x-msvideo"
-        }
-
-        # Try to get MIME type from extension, fallback to constructed type
-        mime_type = mime_type_map.get(filetype, f"{mediatype}/{filetype}") if filetype else "application/octet-stream"
-
-        # Close database session before returning file
-        if project_db_session:
-            project_db_session.close()
+        mime_type = _resolve_mime_type(media_record['filetype'], media_record['mediatype'])
+
+        byte_range = _parse_byte_range(request.headers.get("range"), stat_result.st_size)
+        if byte_range:
+            start, end = byte_range
+            return StreamingResponse(
+                _iter_file_range(filepath, start, end),
+                status_code=206,
+                media_type=mime_type,
+                headers={
+                    "Accept-Ranges": "bytes",
+                    "Content-Range": f"bytes {start}-{end}/{stat_result.st_size}",
+                    "Content-Length": str(end - start + 1)
+                }
+            )
 
         return FileResponse(
             path=filepath,
             filename=media_record['filename'],
-            media_type=mime_type
+            media_type=mime_type,
+            stat_result=stat_result,
+            headers={"Accept-Ranges": "bytes"}
         )
 
     except HTTPException:
@@ -525,6 +801,54 @@ async def download_media(
         raise HTTPException(status_code=500, detail=f"Error downloading media: {str(e)}")
 
 
+_BYTE_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+RANGE_CHUNK_SIZE = 1024 * 1024
+
+
+def _parse_byte_range(header: Optional[str], file_size: int) -> Optional[tuple]:
+    """
+    (start, end) of a single-range Range header, inclusive
+
+    Returns None when the whole file should be sent (no header, multiple
+    ranges or unknown syntax); raises 416 when the range is unsatisfiable.
+    """
+    if not header:
+        return None
+    match = _BYTE_RANGE.fullmatch(header.strip())
+    if not match or not any(match.groups()):
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), file_size - 1) if last else file_size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(file_size - int(last), 0)
+        end = file_size - 1
+
+    if start > end or start >= file_size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"}
+        )
+    return start, end
+
+
+def _iter_file_range(filepath: str, start: int, end: int):
+    """Yield bytes start..end (inclusive) of a file in RANGE_CHUNK_SIZE chunks (run in threadpool)"""
+    remaining = end - start + 1
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        while remaining > 0:
+            chunk = f.read(min(RANGE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
 @router.get("/download-all-zip")
 async def download_all_media_zip(
     current_user: User = Depends(get_current_user)
@@ -542,83 +866,169 @@ async def download_all_media_zip(
     Requires authentication
     """
     try:
-        from backend.config import settings
-
-        # Create in-memory ZIP file
-        zip_buffer = BytesIO()
-
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            # Track file count and total size
-            file_count = 0
-            total_size = 0
-
-            # Function to add files from a directory to the ZIP
-            def add_directory_to_zip(source_dir: str, zip_folder_name: str):
-                nonlocal file_count, total_size
-
-                if not os.path.exists(source_dir):
-                    return
-
-                for root, dirs, files in os.walk(source_dir):
-                    for file in files:
-                        # Skip hidden files and system files
-                        if file.startswith('.'):
-                            continue
-
-                        file_path = os.path.join(root, file)
-
-                        # Calculate relative path within the source directory
-                        relative_path = os.path.relpath(file_path, source_dir)
-
-                        # Add to ZIP with organized folder structure
-                        zip_path = os.path.join(zip_folder_name, relative_path)
-
-                        try:
-                            zip_file.write(file_path, zip_path)
-                            file_count += 1
-                            total_size += os.path.getsize(file_path)
-                        except Exception as e:
-                            print(f"Warning: Could not add {file_path} to ZIP: {e}")
-
-            # Add original images
-            media_root = settings.PYARCHINIT_MEDIA_ROOT
-            add_directory_to_zip(media_root, "original")
-
-            # Add resized images
-            if hasattr(settings, 'PYARCHINIT_MEDIA_RESIZE') and settings.PYARCHINIT_MEDIA_RESIZE:
-                add_directory_to_zip(settings.PYARCHINIT_MEDIA_RESIZE, "resize")
-
-            # Add thumbnails
-            if hasattr(settings, 'PYARCHINIT_MEDIA_THUMB') and settings.PYARCHINIT_MEDIA_THUMB:
-                add_directory_to_zip(settings.PYARCHINIT_MEDIA_THUMB, "thumb")
-
-            # Add videos (if they exist in subdirectory)
-            videos_dir = os.path.join(media_root, "videos")
-            if os.path.exists(videos_dir):
-                add_directory_to_zip(videos_dir, "videos")
-
-            # Add 3D models (if they exist in subdirectory)
-            models_dir = os.path.join(media_root, "3d_models")
-            if os.path.exists(models_dir):
-                add_directory_to_zip(models_dir, "3d_models")
+        # List files first (stat only) so count and size can go in the headers;
+        # the archive itself is produced while streaming
+        media_root = settings.PYARCHINIT_MEDIA_ROOT
+        sources = [(media_root, "original")]
+
+        # Add resized images
+        if hasattr(settings, 'PYARCHINIT_MEDIA_RESIZE') and settings.PYARCHINIT_MEDIA_RESIZE:
+            sources.append((settings.PYARCHINIT_MEDIA_RESIZE, "resize"))
+
+        # Add thumbnails
+        if hasattr(settings, 'PYARCHINIT_MEDIA_THUMB') and settings.PYARCHINIT_MEDIA_THUMB:
+            sources.append((settings.PYARCHINIT_MEDIA_THUMB, "thumb"))
+
+        # Add videos and 3D models (if they exist in subdirectory)
+        sources.append((os.path.join(media_root, "videos"), "videos"))
+        sources.append((os.path.join(media_root, "3d_models"), "3d_models"))
+
+        # os.walk/getsize block: run the directory scan in the threadpool
+        entries = await run_in_threadpool(
+            lambda: [entry for src, folder in sources for entry in _collect_zip_entries(src, folder)]
+        )
 
-        # Seek to beginning of buffer
-        zip_buffer.seek(0)
+        total_size = sum(st.st_size for _, _, st in entries)
 
         # Generate filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"pyarchinit_media_{timestamp}.zip"
 
-        # Return ZIP file as streaming response
+        # Sync generator: Starlette iterates it in the threadpool, so file reads
+        # and compression never run on the event loop
         return StreamingResponse(
-            zip_buffer,
+            _iter_zip(entries),
             media_type="application/zip",
             headers={
                 "Content-Disposition": f"attachment; filename={filename}",
-                "X-File-Count": str(file_count),
+                "X-File-Count": str(len(entries)),
                 "X-Total-Size": str(total_size)
             }
         )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating ZIP file: {str(e)}")
+
+
+# ============================================
+# Streaming ZIP helpers
+# ============================================
+
+# Already-compressed formats are stored as is: DEFLATE would burn CPU for ~no gain
+_STORED_EXTENSIONS = frozenset({
+    '.jpg', '.jpeg', '.png', '.webp', '.gif', '.heic',
+    '.mp4', '.mov', '.webm', '.m4v', '.avi',
+    '.glb', '.usdz', '.zip', '.gz'
+})
+ZIP_CHUNK_SIZE = 1024 * 1024
+# Skipped files logged one by one per pass; the rest are only counted
+ZIP_FAILURES_LOGGED = 10
+# Fast DEFLATE for what is left (OBJ/PLY/GLTF text): most of the gain, little CPU
+ZIP_DEFLATE_LEVEL = 1
+
+
+class _ZipChunkSink:
+    """
+    Write-only target for ZipFile that hands back what was written so far
+
+    It has no seek/tell, so zipfile writes entries with data descriptors
+    and never needs to go back into the archive.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _log_zip_failures(failures: List[tuple]) -> None:
+    """Log skipped ZIP paths once per pass: the first few in full, then a count"""
+    for path, error in failures[:ZIP_FAILURES_LOGGED]:
+        logger.warning("Could not add %s to ZIP: %s", path, error)
+    if len(failures) > ZIP_FAILURES_LOGGED:
+        logger.warning("... and %d more files could not be added to ZIP",
+                       len(failures) - ZIP_FAILURES_LOGGED)
+
+
+def _collect_zip_entries(source_dir: str, zip_folder_name: str) -> List[tuple]:
+    """(file_path, zip_path, stat_result) for every non-hidden file under source_dir"""
+    entries = []
+    failures = []
+    if not os.path.isdir(source_dir):
+        return entries
+
+    # scandir instead of os.walk + getsize: directory type comes from readdir
+    # and the one stat per file is kept for size, mtime and mode
+    pending = [(source_dir, zip_folder_name)]
+    while pending:
+        dir_path, zip_dir = pending.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    # Organized folder structure inside the ZIP
+                    zip_path = f"{zip_dir}/{entry.name}"
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append((entry.path, zip_path))
+                            continue
+                        # Skip hidden files, system files and symlinked directories
+                        if entry.name.startswith('.') or not entry.is_file():
+                            continue
+                        entries.append((entry.path, zip_path, entry.stat()))
+                    except OSError as e:
+                        failures.append((entry.path, e))
+        except OSError as e:
+            failures.append((dir_path, e))
+
+    _log_zip_failures(failures)
+    return entries
+
+
+def _iter_zip(entries: List[tuple]):
+    """Yield the ZIP archive of entries chunk by chunk (memory ~ ZIP_CHUNK_SIZE)"""
+    sink = _ZipChunkSink()
+    failures = []
+    with zipfile.ZipFile(sink, 'w') as zip_file:
+        for file_path, zip_path, st in entries:
+            try:
+                src = open(file_path, 'rb')
+            except OSError as e:
+                failures.append((file_path, e))
+                continue
+
+            # Same header as ZipInfo.from_file, from the stat taken while listing
+            zinfo = zipfile.ZipInfo(zip_path, time.localtime(st.st_mtime)[:6])
+            zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+            zinfo.file_size = st.st_size
+            ext = os.path.splitext(file_path)[1].lower()
+            if ext in _STORED_EXTENSIONS:
+                zinfo.compress_type = zipfile.ZIP_STORED
+            else:
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+                # Public as ZipInfo.compress_level from Python 3.13
+                zinfo._compresslevel = ZIP_DEFLATE_LEVEL
+
+            with src, zip_file.open(zinfo, 'w') as dst:
+                while chunk := src.read(ZIP_CHUNK_SIZE):
+                    dst.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+
+    _log_zip_failures(failures)
+
+    # Central directory
+    yield sink.drain()
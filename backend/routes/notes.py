@@ -8,14 +8,14 @@ from typing import Optional, List
 from pydantic import BaseModel
 from datetime import datetime
 from pathlib import Path
-import shutil
-import json
+import orjson
 
 from backend.services.auth_service import get_current_user
 from backend.models.auth import User
 from backend.services.db_manager import get_db
 from backend.dependencies import get_current_project, get_project_db_session
 from backend.services.ai_processor import AudioTranscriber, ArchaeologicalAIInterpreter
+from backend.services.upload_utils import save_upload_file
 from backend.config import settings
 
 router = APIRouter(prefix="/api/notes", tags=["notes"])
@@ -67,11 +67,9 @@ async def upload_audio(
         audio_filename = f"note_{current_user.id}_{timestamp}_{file.filename}"
         audio_path = audio_dir / audio_filename
 
-        with open(audio_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        file_size = await save_upload_file(file, audio_path)
 
         # Get audio duration (approximate from file size)
-        file_size = audio_path.stat().st_size
         duration_seconds = file_size / 16000  # Rough estimate
 
         # Insert into mobile_notes table
@@ -150,7 +148,7 @@ async def process_note(
             # Parse interpretation and add confidence if available
             interpretation = note['ai_interpretation']
             if isinstance(interpretation, str):
-                interpretation = json.loads(interpretation) if interpretation else {}
+                interpretation = orjson.loads(interpretation) if interpretation else {}
             if interpretation and 'confidence' not in interpretation and note.get('ai_confidence'):
                 interpretation['confidence'] = note['ai_confidence']
 
@@ -202,7 +200,7 @@ async def process_note(
             'transcription': transcription_result['text'],
             'transcription_confidence': transcription_result['confidence'],
             'detected_language': transcription_result['language'],
-            'ai_interpretation': json.dumps(interpretation, ensure_ascii=False) if interpretation else None,
+            'ai_interpretation': orjson.dumps(interpretation).decode() if interpretation else None,
             'ai_confidence': ai_confidence,
             'status': 'processed',
             'updated_at': datetime.utcnow(),
@@ -267,11 +265,11 @@ async def get_notes(
             interpretation = row.ai_interpretation
             if interpretation and isinstance(interpretation, str):
                 try:
-                    interp_dict = json.loads(interpretation)
+                    interp_dict = orjson.loads(interpretation)
                     if 'confidence' not in interp_dict and row.ai_confidence:
                         interp_dict['confidence'] = row.ai_confidence
-                        interpretation = json.dumps(interp_dict, ensure_ascii=False)
-                except json.JSONDecodeError:
+                        interpretation = orjson.dumps(interp_dict).decode()
+                except orjson.JSONDecodeError:
                     pass  # Keep original if parsing fails
 
             notes.append(NoteResponse(
@@ -3,6 +3,8 @@ Multi-Project Management Routes
 Handles project CRUD, team management, and database switching
 """
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Header
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import Optional, List
@@ -36,7 +38,10 @@ from backend.models.projects import (
     ProjectPermissions
 )
 
-router = APIRouter(prefix="/api/projects", tags=["projects"])
+router = APIRouter(prefix="/api/projects", tags=["projects"], default_response_class=ORJSONResponse)
+
+# Serializer for the project list, built once at import
+_PROJECT_LIST_ADAPTER = TypeAdapter(ProjectListResponse)
 
 
 # ============================================================================
@@ -78,15 +83,6 @@ def _check_permission(db: Session, project_id: int, user_id: int, required_permi
     return permissions.get(required_permission, False)
 
 
-def _get_team_size(db: Session, project_id: int) -> int:
-    """Get number of team members in project"""
-    result = db.execute(
-        text("SELECT COUNT(*) FROM project_teams WHERE project_id = :project_id"),
-        {"project_id": project_id}
-    ).scalar()
-    return result or 0
-
-
 def _build_project_list_item(row, role: str, team_size: int) -> dict:
     """Build ProjectListItem from database row"""
     return {
@@ -123,7 +119,11 @@ def _build_project_info(row, role: str, permissions: dict, team_members: List[di
 # PROJECT CRUD ENDPOINTS
 # ============================================================================
 
-@router.get("/my-projects", response_model=ProjectListResponse)
+@router.get(
+    "/my-projects",
+    response_model=None,
+    responses={200: {"model": ProjectListResponse}}
+)
 async def get_my_projects(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_auth_db)
@@ -134,8 +134,9 @@ async def get_my_projects(
     """
     try:
         # Query projects where user is a team member
+        # (UNIQUE(project_id, user_id) on project_teams: one row per project, no DISTINCT needed)
         query = text("""
-            SELECT DISTINCT
+            SELECT
                 p.id,
                 p.name,
                 p.description,
@@ -143,28 +144,38 @@ async def get_my_projects(
                 p.is_personal,
                 p.created_at,
                 p.updated_at,
-                pt.role
+                pt.role,
+                COALESCE(tc.team_size, 0) AS team_size
             FROM projects p
             INNER JOIN project_teams pt ON p.id = pt.project_id
+            LEFT JOIN (
+                SELECT project_id, COUNT(*) AS team_size
+                FROM project_teams
+                GROUP BY project_id
+            ) tc ON tc.project_id = p.id
             WHERE pt.user_id = :user_id
             ORDER BY p.is_personal DESC, p.created_at DESC
         """)
 
+        # Team sizes come from the grouped subquery: one statement for the whole list
         results = db.execute(query, {"user_id": current_user.id}).fetchall()
 
         projects = []
         for row in results:
-            project_id = row[0]
             role = row[7]
-            team_size = _get_team_size(db, project_id)
+            team_size = row[8]
 
             project = _build_project_list_item(row, role, team_size)
             projects.append(ProjectListItem(**project))
 
-        return ProjectListResponse(
-            success=True,
-            projects=projects,
-            total=len(projects)
+        # Serialize with the prebuilt adapter (no response_model re-validation)
+        return Response(
+            content=_PROJECT_LIST_ADAPTER.dump_json(ProjectListResponse(
+                success=True,
+                projects=projects,
+                total=len(projects)
+            )),
+            media_type="application/json"
         )
 
     except Exception as e:
@@ -212,7 +223,8 @@ async def create_project(
             }
         )
 
-        project_id = db.execute(text("SELECT last_insert_rowid()")).scalar()
+        # cursor.lastrowid of the INSERT above: no extra SELECT round-trip
+        project_id = result.lastrowid
 
         # Add user as owner in team
         db.execute(
@@ -1,5 +1,5 @@
-import os
 import json
+import orjson
 from pathlib import Path
 from typing import Dict, Optional
 from openai import OpenAI
@@ -161,7 +161,7 @@ class ArchaeologicalAIInterpreter:
             elif "```" in response_text:
                 json_text = response_text.split("```")[1].split("```")[0].strip()
 
-            result = json.loads(json_text)
+            result = orjson.loads(json_text)
 
             # Validate and normalize with language mapping
             return self._validate_interpretation(result, language)
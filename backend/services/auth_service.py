@@ -9,22 +9,32 @@ Handles:
 - Current user extraction from tokens
 """
 
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
-from fastapi import Depends, HTTPException, status
+from functools import lru_cache
+from typing import Dict, Optional
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from passlib.context import CryptContext
 import jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
 
 from backend.config import settings
-from backend.models.auth import User, Project, ProjectTeam, ProjectRole
-from backend.services.db_manager import get_auth_db, create_user_database, get_db_mode
+from backend.models.auth import User, Project, ProjectRole, role_str
+from backend.services.db_manager import get_auth_session, create_user_database, get_db_mode
+from backend.services.response_cache import delete_cached
 
 
 # Password hashing configuration
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is CPU-bound: run it here so it never blocks the event loop
+_KDF_POOL = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="kdf")
+
 # JWT configuration
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_DAYS = 30
@@ -32,6 +42,86 @@ ACCESS_TOKEN_EXPIRE_DAYS = 30
 # Security scheme for FastAPI
 security = HTTPBearer()
 
+# Per-process cache of the account columns checked on every authenticated request.
+# Entries are keyed by a per-user version and a time bucket. The version is bumped
+# when a transaction changing the user commits, which only reaches the committing
+# worker process: other workers keep serving the cached row until their current
+# USER_CACHE_TTL bucket ends, so a deactivation/role change can take up to
+# USER_CACHE_TTL seconds to be enforced everywhere.
+USER_CACHE_TTL = 60
+_user_versions: Dict[int, int] = {}
+
+# Shared (Redis) cache of the admin user list, see routes/auth.get_all_users
+ADMIN_USERS_CACHE_KEY = "auth:admin:users"
+
+# Session.info key collecting the users changed by the pending transaction
+_CHANGED_USERS_KEY = "auth_changed_user_ids"
+
+
+def invalidate_user_cache(user_id: int) -> None:
+    """Drop cached auth data for a user (call after raw SQL updates to users)"""
+    _user_versions[user_id] = _user_versions.get(user_id, 0) + 1
+    delete_cached(ADMIN_USERS_CACHE_KEY)
+
+
+def _track_user_change(target, user_id: Optional[int]) -> None:
+    """Remember a flushed user change; caches are invalidated on commit"""
+    session = object_session(target)
+    if session is None:
+        # Not bound to a session (shouldn't happen at flush): invalidate now
+        if user_id is None:
+            delete_cached(ADMIN_USERS_CACHE_KEY)
+        else:
+            invalidate_user_cache(user_id)
+        return
+    session.info.setdefault(_CHANGED_USERS_KEY, set()).add(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_change(mapper, connection, target):
+    _track_user_change(target, target.id)
+
+
+@event.listens_for(User, "after_insert")
+def _invalidate_on_user_insert(mapper, connection, target):
+    # New users only affect the admin list (None: no per-user version to bump)
+    _track_user_change(target, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    # Bump after commit, not at flush: a concurrent request must not re-cache
+    # the old row between the flush and the commit (or keep a rolled back change)
+    user_ids = session.info.pop(_CHANGED_USERS_KEY, None)
+    if not user_ids:
+        return
+    for user_id in user_ids:
+        if user_id is not None:
+            _user_versions[user_id] = _user_versions.get(user_id, 0) + 1
+    delete_cached(ADMIN_USERS_CACHE_KEY)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_users(session):
+    session.info.pop(_CHANGED_USERS_KEY, None)
+
+
+@lru_cache(maxsize=4096)
+def _load_user_auth(user_id: int, version: int, time_bucket: int) -> Optional[tuple]:
+    """Load (id, email, name, role, is_active, approval_status) for a user"""
+    with get_auth_session() as db:
+        row = db.execute(
+            select(
+                User.id, User.email, User.name, User.role,
+                User.is_active, User.approval_status
+            ).where(User.id == user_id)
+        ).first()
+    if row is None:
+        return None
+    # Normalize role once here: Enum (PostgreSQL) or String (SQLite)
+    return (row.id, row.email, row.name, role_str(row.role), row.is_active, row.approval_status)
+
 
 class AuthService:
     """Authentication service"""
@@ -63,6 +153,23 @@ class AuthService:
         """
         return pwd_context.verify(plain_password, hashed_password)
 
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        """
+        Verify password against hash in the KDF thread pool
+
+        Args:
+            plain_password: Plain text password
+            hashed_password: Hashed password
+
+        Returns:
+            True if password matches
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _KDF_POOL, pwd_context.verify, plain_password, hashed_password
+        )
+
     @staticmethod
     def create_access_token(user_id: int, email: str, role: str = "archaeologist") -> str:
         """
@@ -134,7 +241,7 @@ class AuthService:
             db: Database session
 
         Returns:
-            Created user
+            Created user (flushed, not committed: the caller commits)
 
         Raises:
             HTTPException: If email already exists
@@ -161,8 +268,7 @@ class AuthService:
             approval_status="approved" if is_first_user else "pending"
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        db.flush()
 
         if is_first_user:
             print(f"🎉 First user registered! Auto-assigned admin role: {user.email}")
@@ -175,8 +281,7 @@ class AuthService:
             success = create_user_database(user.id)
             if not success:
                 # Rollback user creation if database creation fails
-                db.delete(user)
-                db.commit()
+                db.rollback()
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Failed to create user database"
@@ -190,8 +295,7 @@ class AuthService:
                 owner_user_id=user.id
             )
             db.add(project)
-            db.commit()
-            db.refresh(project)
+            db.flush()
 
             # Add user as project owner
             collaborator = ProjectCollaborator(
@@ -200,12 +304,12 @@ class AuthService:
                 role=ProjectRole.OWNER
             )
             db.add(collaborator)
-            db.commit()
+            db.flush()
 
         return user
 
     @staticmethod
-    def login(email: str, password: str, db: Session) -> dict:
+    async def login(email: str, password: str, db: Session) -> dict:
         """
         Login user
 
@@ -228,8 +332,8 @@ class AuthService:
                 detail="Invalid credentials"
             )
 
-        # Verify password
-        if not AuthService.verify_password(password, user.password_hash):
+        # Verify password (off the event loop; the session stays on this thread)
+        if not await AuthService.verify_password_async(password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
@@ -256,13 +360,12 @@ class AuthService:
             )
 
         # Create token
-        # Handle both Enum (PostgreSQL) and String (SQLite) for role
-        role_str = user.role.value if hasattr(user.role, 'value') else user.role
+        role = role_str(user.role)
 
         token = AuthService.create_access_token(
             user_id=user.id,
             email=user.email,
-            role=role_str
+            role=role
         )
 
         return {
@@ -272,15 +375,15 @@ class AuthService:
                 "id": user.id,
                 "email": user.email,
                 "name": user.name,
-                "role": role_str
+                "role": role
             }
         }
 
 
 # FastAPI dependencies
 def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_auth_db)
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> User:
     """
     FastAPI dependency to get current authenticated user
@@ -290,16 +393,24 @@ def get_current_user(
         def protected_route(current_user: User = Depends(get_current_user)):
             return {"user_id": current_user.id}
 
+    The resolved user is memoized on request.state, so the token is decoded once
+    per request even when several dependencies ask for the user.
+
     Args:
+        request: Current request
         credentials: Bearer token from request
-        db: Database session
 
     Returns:
-        Current user
+        Current user (detached snapshot of the account columns, role as plain
+        string; re-query to modify)
 
     Raises:
         HTTPException: If token is invalid or user not found
     """
+    user = getattr(request.state, "current_user", None)
+    if user is not None:
+        return user
+
     token = credentials.credentials
     payload = AuthService.verify_token(token)
 
@@ -310,14 +421,24 @@ def get_current_user(
             detail="Invalid token payload"
         )
 
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
+    # Get user from the per-process cache (one DB read per user per version/TTL)
+    cached = _load_user_auth(
+        user_id,
+        _user_versions.get(user_id, 0),
+        int(time.monotonic() // USER_CACHE_TTL)
+    )
+    if cached is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
 
+    user_id, email, name, role, is_active, approval_status = cached
+    user = User(
+        id=user_id, email=email, name=name, role=role,
+        is_active=is_active, approval_status=approval_status
+    )
+
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -337,6 +458,7 @@ def get_current_user(
             detail="Account registration was rejected"
         )
 
+    request.state.current_user = user
     return user
 
 
@@ -386,9 +508,8 @@ def require_admin(current_user: User = Depends(get_current_user)) -> User:
     Raises:
         HTTPException: If user is not admin
     """
-    # Handle both Enum (PostgreSQL) and String (SQLite) for role
-    role_str = current_user.role.value if hasattr(current_user.role, 'value') else current_user.role
-    if role_str != "admin":
+    # get_current_user already normalizes role to a plain string
+    if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
@@ -6,7 +6,7 @@ Handles connections for:
 - SQLite Mode: Local development
 
 Usage:
-    from services.db_manager import get_db, create_user_database
+    from backend.services.db_manager import get_db, create_user_database
 
     # Get database session for current user
     db = get_db(user_id=user.id)
@@ -15,16 +15,14 @@ Usage:
     create_user_database(user_id=123)
 """
 
-import os
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
-from contextlib import contextmanager
 from typing import Generator, Optional
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 
-from config import settings
+from backend.config import settings
 
 
 class DatabaseManager:
@@ -96,6 +94,8 @@ class DatabaseManager:
                 self.engines[user_id] = create_engine(
                     url,
                     pool_pre_ping=True,
+                    executemany_mode="values_plus_batch",
+                    pool_recycle=settings.DB_POOL_RECYCLE,
                     echo=False
                 )
             return self.engines[user_id]
@@ -117,8 +117,10 @@ class DatabaseManager:
                 self._engine = create_engine(
                     url,
                     pool_pre_ping=True,
-                    pool_size=10,
-                    max_overflow=20,
+                    executemany_mode="values_plus_batch",
+                    pool_size=settings.DB_POOL_SIZE,
+                    max_overflow=settings.DB_MAX_OVERFLOW,
+                    pool_recycle=settings.DB_POOL_RECYCLE,
                     echo=False
                 )
 
@@ -135,8 +137,7 @@ class DatabaseManager:
             SQLAlchemy Session
         """
         engine = self.get_engine(user_id)
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-        session = SessionLocal()
+        session = Session(bind=engine, autoflush=False)
 
         # Set Row-Level Security context for hybrid mode
         if self.mode == "hybrid" and user_id:
@@ -211,7 +212,7 @@ class DatabaseManager:
         engine = self.get_engine(user_id)
 
         # Import models and create tables
-        from models import database as models
+        from backend.models import database as models
         models.Base.metadata.create_all(bind=engine)
 
         print(f"Initialized schema for user {user_id}")
@@ -291,11 +292,8 @@ def get_db(user_id: Optional[int] = None) -> Generator[Session, None, None]:
     Yields:
         Database session
     """
-    session = db_manager.get_session(user_id)
-    try:
+    with db_manager.get_session(user_id) as session:
         yield session
-    finally:
-        session.close()
 
 
 # Utility functions
@@ -348,9 +346,13 @@ def get_auth_session() -> Session:
     Returns:
         SQLAlchemy Session for auth database
     """
-    engine = get_auth_engine()
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    return SessionLocal()
+    # Cache the session factory alongside the singleton auth engine
+    if not hasattr(get_auth_session, '_session_factory'):
+        get_auth_session._session_factory = sessionmaker(
+            autocommit=False, autoflush=False, bind=get_auth_engine()
+        )
+
+    return get_auth_session._session_factory()
 
 
 def get_auth_db() -> Generator[Session, None, None]:
@@ -371,11 +373,8 @@ def get_auth_db() -> Generator[Session, None, None]:
     Yields:
         Auth database session
     """
-    session = get_auth_session()
-    try:
+    with get_auth_session() as session:
         yield session
-    finally:
-        session.close()
 
 
 def get_engine(user_id: Optional[int] = None):
@@ -8,9 +8,12 @@ from __future__ import annotations
 import os
 import json
 import shutil
+import tempfile
+import threading
+from contextlib import nullcontext
 from typing import Dict, Optional, TYPE_CHECKING
 from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.pool import StaticPool
 
 from backend.config import settings
@@ -18,6 +21,21 @@ from backend.config import settings
 if TYPE_CHECKING:
     from backend.models.auth import User
 
+# Path al database template (completo, ~4.9MB), risolto una volta all'import
+TEMPLATE_DB_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pyarchinit_db.sqlite")
+)
+
+# Un lock per path: serializza le inizializzazioni dello stesso database nel processo
+_init_locks: Dict[str, threading.Lock] = {}
+_init_locks_guard = threading.Lock()
+
+
+def _init_lock(db_path: str) -> threading.Lock:
+    """Lock dedicato all'inizializzazione di db_path"""
+    with _init_locks_guard:
+        return _init_locks.setdefault(db_path, threading.Lock())
+
 
 class DynamicDatabaseManager:
     """
@@ -178,6 +196,9 @@ class DynamicDatabaseManager:
             connection_string,
             pool_size=5,
             max_overflow=10,
+            pool_pre_ping=True,
+            executemany_mode="values_plus_batch",
+            pool_recycle=settings.DB_POOL_RECYCLE,
             echo=False
         )
 
@@ -190,12 +211,7 @@ class DynamicDatabaseManager:
         Copia il database pyarchinit_db.sqlite (completo con schema e dati) come template
         invece di eseguire SQL, garantendo che tutte le tabelle e relazioni siano corrette.
         """
-        # Path al database template (completo, ~4.9MB)
-        template_db_path = os.path.join(
-            os.path.dirname(__file__),
-            "..",
-            "pyarchinit_db.sqlite"
-        )
+        template_db_path = TEMPLATE_DB_PATH
 
         if not os.path.exists(template_db_path):
             raise FileNotFoundError(
@@ -203,8 +219,28 @@ class DynamicDatabaseManager:
                 f"Expected a complete PyArchInit database file (~4-5MB)"
             )
 
-        # Copia il database template nella posizione target
-        shutil.copy2(template_db_path, db_path)
+        # Idempotente: la creazione lazy (_create_sqlite_engine) e il BackgroundTask
+        # di registrazione possono arrivare insieme. Un database già presente non va
+        # mai sovrascritto: potrebbe essere già aperto e contenere dati.
+        with _init_lock(db_path):
+            if os.path.exists(db_path):
+                return
+
+            # Copia su file temporaneo univoco nella stessa directory, poi link
+            # atomico: nessuno apre un database copiato a metà, e se un altro
+            # processo ha già creato il file il link fallisce invece di sostituirlo
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(db_path), prefix=os.path.basename(db_path) + ".", suffix=".tmp"
+            )
+            os.close(fd)
+            try:
+                shutil.copy2(template_db_path, tmp_path)
+                try:
+                    os.link(tmp_path, db_path)
+                except FileExistsError:
+                    return
+            finally:
+                os.unlink(tmp_path)
 
         print(f"✅ Initialized PyArchInit database from template: {db_path}")
         print(f"   Template: {template_db_path} ({os.path.getsize(template_db_path) / 1024 / 1024:.1f}MB)")
@@ -251,21 +287,32 @@ class DynamicDatabaseManager:
 
         print(f"✅ Row-Level Security configured for project {project_id}")
 
-    def create_personal_workspace(self, user_id: int, user_name: str) -> int:
+    def create_personal_workspace(
+        self,
+        user_id: int,
+        user_name: str,
+        conn: Optional[Connection] = None,
+        initialize_db: bool = True
+    ) -> int:
         """
         Crea workspace personale per nuovo utente.
 
         Args:
             user_id: ID dell'utente
             user_name: Nome dell'utente
+            conn: Connessione auth già in transazione (es. session.connection()).
+                  Se passata, non viene fatto commit: lo fa il chiamante.
+            initialize_db: Se False non copia il database template; il chiamante
+                  deve invocare initialize_personal_workspace_db (es. in background).
 
         Returns:
             ID del progetto creato
         """
-        db_path = f"/data/users/user_{user_id}.sqlite"
+        db_path = self._personal_db_path(user_id)
+        owns_conn = conn is None
 
         # Crea record progetto
-        with self.auth_engine.connect() as conn:
+        with (self.auth_engine.connect() if owns_conn else nullcontext(conn)) as conn:
             result = conn.execute(
                 text("""
                     INSERT INTO projects (name, description, owner_id, db_mode, db_config, is_personal)
@@ -281,7 +328,8 @@ class DynamicDatabaseManager:
                 }
             )
 
-            project_id = conn.execute(text("SELECT last_insert_rowid()")).scalar()
+            # cursor.lastrowid of the INSERT above: no extra SELECT round-trip
+            project_id = result.lastrowid
 
             # Aggiungi utente al team del progetto
             conn.execute(
@@ -301,16 +349,33 @@ class DynamicDatabaseManager:
                 }
             )
 
-            conn.commit()
+            if owns_conn:
+                conn.commit()
 
         # Inizializza database SQLite
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        self._initialize_pyarchinit_db(db_path)
+        if initialize_db:
+            self.initialize_personal_workspace_db(user_id)
 
         print(f"✅ Created personal workspace for user {user_id} (project {project_id})")
 
         return project_id
 
+    @staticmethod
+    def _personal_db_path(user_id: int) -> str:
+        """Path del database SQLite del workspace personale"""
+        return f"/data/users/user_{user_id}.sqlite"
+
+    def initialize_personal_workspace_db(self, user_id: int):
+        """
+        Copia il database template per il workspace personale.
+
+        È la parte lenta (~5MB su disco) della creazione del workspace:
+        può essere eseguita dopo la risposta (BackgroundTasks).
+        """
+        db_path = self._personal_db_path(user_id)
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._initialize_pyarchinit_db(db_path)
+
     def close_all(self):
         """Chiudi tutte le connessioni"""
         for project_id, engine in self._project_engines.items():
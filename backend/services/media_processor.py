@@ -3,15 +3,56 @@ Media processing service
 Handles image, video, and 3D model processing with pyArchInit compatibility
 """
 import os
-import hashlib
 from datetime import datetime
 from typing import Dict, Optional
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
 from PIL import Image
-from io import BytesIO
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
 from backend.config import settings
+from backend.services.upload_utils import save_upload_file
+
+# pyArchInit derived image sizes and resampling filter
+THUMB_SIZE = (150, 150)
+RESIZE_SIZE = (800, 600)
+IMAGE_RESAMPLE = Image.Resampling.LANCZOS
+
+# Media inserts (pyArchInit schema), built once at import
+_INSERT_MEDIA = text("""
+    INSERT INTO media_table (
+        mediatype, filename, filetype, filepath, descrizione
+    )
+    VALUES (:mediatype, :filename, :filetype, :filepath, :description)
+    RETURNING id_media
+""")
+
+_INSERT_MEDIA_THUMB = text("""
+    INSERT INTO media_thumb_table (
+        id_media, mediatype, media_filename, media_thumb_filename,
+        filetype, filepath, path_resize
+    )
+    VALUES (:id_media, :mediatype, :media_filename, :media_thumb_filename,
+            :filetype, :filepath, :path_resize)
+""")
+
+_INSERT_MEDIA_TO_ENTITY = text("""
+    INSERT INTO media_to_entity_table (
+        id_entity, entity_type, table_name, id_media, filepath, media_name
+    )
+    VALUES (:id_entity, :entity_type, :table_name, :id_media, :filepath, :media_name)
+""")
+
+# Media row plus its thumb/resize paths, for downloads
+_SELECT_MEDIA_DOWNLOAD = text("""
+    SELECT m.filepath, m.filename, m.filetype, m.mediatype,
+           t.filepath AS thumb_filepath, t.path_resize
+    FROM media_table m
+    LEFT JOIN media_thumb_table t ON t.id_media = m.id_media
+    WHERE m.id_media = :media_id
+    LIMIT 1
+""")
 
 
 class MediaProcessor:
@@ -50,7 +91,7 @@ class MediaProcessor:
 
     async def process_image(
         self,
-        content: bytes,
+        upload: UploadFile,
         original_filename: str,
         sito: str,
         entity_type: Optional[str] = None,
@@ -60,7 +101,24 @@ class MediaProcessor:
         """
         Process image: create original, thumbnail (150x150), and resized (800x600) versions
         Returns dict with file paths
+
+        Decoding and resampling are CPU bound: they run in the threadpool so
+        the event loop keeps serving other requests.
         """
+        return await run_in_threadpool(
+            self._process_image_sync, upload, original_filename, sito, entity_type, entity_id, user_id
+        )
+
+    def _process_image_sync(
+        self,
+        upload: UploadFile,
+        original_filename: str,
+        sito: str,
+        entity_type: Optional[str],
+        entity_id: Optional[int],
+        user_id: Optional[int]
+    ) -> Dict:
+        """Blocking body of process_image"""
         try:
             # Generate filename following pyArchInit convention
             # Format: {sito}_{entity_type}_{entity_id}_{timestamp}.{ext}
@@ -72,8 +130,8 @@ class MediaProcessor:
             else:
                 filename = f"{sito}_mobile_{user_id}_{timestamp}{file_ext}"
 
-            # Open image from bytes
-            img = Image.open(BytesIO(content))
+            # Open image straight from the spooled upload file (no bytes copy in memory)
+            img = Image.open(upload.file)
 
             # Convert RGBA to RGB if needed
             if img.mode == 'RGBA':
@@ -83,20 +141,20 @@ class MediaProcessor:
             original_path = os.path.join(settings.PYARCHINIT_MEDIA_ROOT, filename)
             img.save(original_path, quality=95)
 
-            # Create thumbnail (150x150)
-            thumb = img.copy()
-            thumb.thumbnail((150, 150), Image.Resampling.LANCZOS)
-            thumb_filename = f"thumb_{filename}"
-            thumb_path = os.path.join(settings.PYARCHINIT_MEDIA_THUMB, thumb_filename)
-            thumb.save(thumb_path, quality=85)
-
             # Create resized (800x600)
             resized = img.copy()
-            resized.thumbnail((800, 600), Image.Resampling.LANCZOS)
+            resized.thumbnail(RESIZE_SIZE, IMAGE_RESAMPLE)
             resize_filename = f"resize_{filename}"
             resize_path = os.path.join(settings.PYARCHINIT_MEDIA_RESIZE, resize_filename)
             resized.save(resize_path, quality=90)
 
+            # Create thumbnail (150x150) from the resized copy, not the full-size image
+            thumb = resized.copy()
+            thumb.thumbnail(THUMB_SIZE, IMAGE_RESAMPLE)
+            thumb_filename = f"thumb_{filename}"
+            thumb_path = os.path.join(settings.PYARCHINIT_MEDIA_THUMB, thumb_filename)
+            thumb.save(thumb_path, quality=85)
+
             return {
                 'filename': filename,
                 'filetype': file_ext.replace('.', ''),
@@ -112,16 +170,20 @@ class MediaProcessor:
 
     async def process_video(
         self,
-        content: bytes,
+        upload: Optional[UploadFile],
         original_filename: str,
         sito: str,
         entity_type: Optional[str] = None,
         entity_id: Optional[int] = None,
-        user_id: Optional[int] = None
+        user_id: Optional[int] = None,
+        source_path: Optional[str] = None
     ) -> Dict:
         """
         Process video: save original file
         Future: generate thumbnail from first frame
+
+        source_path: already assembled file (resumable upload), moved into place
+        instead of reading upload
         """
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -136,10 +198,12 @@ class MediaProcessor:
             video_dir = os.path.join(settings.PYARCHINIT_MEDIA_ROOT, "videos")
             os.makedirs(video_dir, exist_ok=True)
 
-            # Save video file
+            # Save video file (streamed in chunks)
             filepath = os.path.join(video_dir, filename)
-            with open(filepath, 'wb') as f:
-                f.write(content)
+            if source_path:
+                os.replace(source_path, filepath)
+            else:
+                await save_upload_file(upload, filepath)
 
             return {
                 'filename': filename,
@@ -152,17 +216,21 @@ class MediaProcessor:
 
     async def process_3d_model(
         self,
-        content: bytes,
+        upload: Optional[UploadFile],
         original_filename: str,
         sito: str,
         entity_type: Optional[str] = None,
         entity_id: Optional[int] = None,
         user_id: Optional[int] = None,
-        scan_type: str = "lidar"
+        scan_type: str = "lidar",
+        source_path: Optional[str] = None
     ) -> Dict:
         """
         Process 3D model: save original file
         Supports: .obj, .ply, .usdz, .glb, .gltf
+
+        source_path: already assembled file (resumable upload), moved into place
+        instead of reading upload
         """
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -177,10 +245,12 @@ class MediaProcessor:
             model_dir = os.path.join(settings.PYARCHINIT_MEDIA_ROOT, "3d_models")
             os.makedirs(model_dir, exist_ok=True)
 
-            # Save 3D model file
+            # Save 3D model file (streamed in chunks)
             filepath = os.path.join(model_dir, filename)
-            with open(filepath, 'wb') as f:
-                f.write(content)
+            if source_path:
+                os.replace(source_path, filepath)
+            else:
+                await save_upload_file(upload, filepath)
 
             return {
                 'filename': filename,
@@ -199,29 +269,22 @@ class MediaProcessor:
         filetype: str,
         filepath: str,
         description: Optional[str] = None,
-        user_id: Optional[int] = None
+        user_id: Optional[int] = None,
+        commit: bool = True
     ) -> int:
         """Insert record into media_table and return media_id"""
         try:
-            # Use raw SQL for compatibility with existing pyArchInit schema
-            query = text("""
-                INSERT INTO media_table (
-                    mediatype, filename, filetype, filepath, descrizione
-                )
-                VALUES (:mediatype, :filename, :filetype, :filepath, :description)
-            """)
-
-            result = db.execute(query, {
+            # Use raw SQL for compatibility with existing pyArchInit schema;
+            # RETURNING gives the id on the same statement (SQLite and PostgreSQL)
+            media_id = db.execute(_INSERT_MEDIA, {
                 'mediatype': mediatype,
                 'filename': filename,
                 'filetype': filetype,
                 'filepath': filepath,
                 'description': description or ''
-            })
-            db.commit()
-
-            # Get the last inserted ID
-            media_id = db.execute(text("SELECT last_insert_rowid()")).scalar()
+            }).scalar()
+            if commit:
+                db.commit()
             return media_id
 
         except Exception as e:
@@ -237,20 +300,12 @@ class MediaProcessor:
         filename_thumb: str,
         filetype: str,
         filepath_thumb: str,
-        filepath_resize: str
-    ) -> int:
+        filepath_resize: str,
+        commit: bool = True
+    ) -> None:
         """Insert record into media_thumb_table"""
         try:
-            query = text("""
-                INSERT INTO media_thumb_table (
-                    id_media, mediatype, media_filename, media_thumb_filename,
-                    filetype, filepath, path_resize
-                )
-                VALUES (:id_media, :mediatype, :media_filename, :media_thumb_filename,
-                        :filetype, :filepath, :path_resize)
-            """)
-
-            result = db.execute(query, {
+            db.execute(_INSERT_MEDIA_THUMB, {
                 'id_media': media_id,
                 'mediatype': mediatype,
                 'media_filename': filename,
@@ -259,10 +314,8 @@ class MediaProcessor:
                 'filepath': filepath_thumb,
                 'path_resize': filepath_resize
             })
-            db.commit()
-
-            thumb_id = db.execute(text("SELECT last_insert_rowid()")).scalar()
-            return thumb_id
+            if commit:
+                db.commit()
 
         except Exception as e:
             db.rollback()
@@ -276,18 +329,12 @@ class MediaProcessor:
         table_name: str,
         id_media: int,
         filepath: str,
-        media_name: str
-    ) -> int:
+        media_name: str,
+        commit: bool = True
+    ) -> None:
         """Insert record into media_to_entity_table to link media to entity"""
         try:
-            query = text("""
-                INSERT INTO media_to_entity_table (
-                    id_entity, entity_type, table_name, id_media, filepath, media_name
-                )
-                VALUES (:id_entity, :entity_type, :table_name, :id_media, :filepath, :media_name)
-            """)
-
-            result = db.execute(query, {
+            db.execute(_INSERT_MEDIA_TO_ENTITY, {
                 'id_entity': id_entity,
                 'entity_type': entity_type,
                 'table_name': table_name,
@@ -295,15 +342,41 @@ class MediaProcessor:
                 'filepath': filepath,
                 'media_name': media_name
             })
-            db.commit()
-
-            link_id = db.execute(text("SELECT last_insert_rowid()")).scalar()
-            return link_id
+            if commit:
+                db.commit()
 
         except Exception as e:
             db.rollback()
             raise Exception(f"Error inserting media-to-entity record: {str(e)}")
 
+    def insert_media_bundle(
+        self,
+        db: Session,
+        media: Dict,
+        thumb: Optional[Dict] = None,
+        entity_link: Optional[Dict] = None
+    ) -> int:
+        """
+        Insert media record, optional thumb record and optional entity link
+        in a single transaction (one commit) and return media_id
+
+        Args:
+            media: insert_media_record arguments
+            thumb: insert_media_thumb_record arguments, without media_id
+            entity_link: insert_media_to_entity_record arguments, without id_media
+        """
+        media_id = self.insert_media_record(db, **media, commit=False)
+        if thumb:
+            self.insert_media_thumb_record(db, media_id=media_id, **thumb, commit=False)
+        if entity_link:
+            self.insert_media_to_entity_record(db, id_media=media_id, **entity_link, commit=False)
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise Exception(f"Error inserting media record: {str(e)}")
+        return media_id
+
     def get_media_by_id(self, db: Session, media_id: int):
         """Get media record by ID"""
         try:
@@ -315,6 +388,16 @@ class MediaProcessor:
         except Exception as e:
             raise Exception(f"Error getting media: {str(e)}")
 
+    def get_media_download_info(self, db: Session, media_id: int):
+        """Get media record with its thumb/resize paths in a single query"""
+        try:
+            result = db.execute(_SELECT_MEDIA_DOWNLOAD, {'media_id': media_id}).fetchone()
+            if result:
+                return dict(result._mapping)
+            return None
+        except Exception as e:
+            raise Exception(f"Error getting media: {str(e)}")
+
     def get_media_thumb_by_media_id(self, db: Session, media_id: int):
         """Get media thumbnail record by media ID"""
         try:
@@ -0,0 +1,87 @@
+"""
+Best-effort Redis cache for serialized JSON responses
+
+Redis is optional for this app: if it is unreachable every call behaves as a
+cache miss and the endpoint simply runs its queries. After a failure Redis is
+not retried for REDIS_RETRY_AFTER seconds, so a missing server costs one short
+timeout instead of one per request.
+"""
+import hashlib
+import time
+from functools import lru_cache
+from typing import Optional
+
+import redis
+from fastapi import Request
+from fastapi.responses import Response
+
+from backend.config import settings
+
+# Cache-policy tiers (seconds)
+CACHE_TTL_SHORT = 10
+CACHE_TTL_NORMAL = 30
+CACHE_TTL_LONG = 300
+
+REDIS_RETRY_AFTER = 30
+_redis_down_until = 0.0
+
+
+@lru_cache(maxsize=1)
+def _get_client() -> redis.Redis:
+    """Build the Redis client once per process"""
+    return redis.Redis.from_url(
+        settings.REDIS_URL,
+        socket_connect_timeout=0.1,
+        socket_timeout=0.1
+    )
+
+
+def _call(method: str, *args, **kwargs):
+    """Run a Redis command, returning None when Redis is unavailable"""
+    global _redis_down_until
+    if time.monotonic() < _redis_down_until:
+        return None
+    try:
+        return getattr(_get_client(), method)(*args, **kwargs)
+    except redis.RedisError:
+        _redis_down_until = time.monotonic() + REDIS_RETRY_AFTER
+        return None
+
+
+def get_cached(key: str) -> Optional[bytes]:
+    """Cached response body for key, or None on miss"""
+    return _call("get", key)
+
+
+def set_cached(key: str, value: bytes, ttl: int = CACHE_TTL_NORMAL) -> None:
+    """Store a response body for ttl seconds"""
+    _call("set", key, value, ex=ttl)
+
+
+def delete_cached(*keys: str) -> None:
+    """Invalidate cached responses"""
+    if keys:
+        _call("delete", *keys)
+
+
+def etag_response(request: Request, body: bytes) -> Response:
+    """
+    JSON response with an ETag over body; 304 Not Modified if the client has it
+
+    Args:
+        request: Incoming request (its If-None-Match header is checked)
+        body: Serialized JSON body
+
+    Returns:
+        304 response without body, or 200 response carrying body and ETag
+    """
+    etag = '"' + hashlib.md5(body, usedforsecurity=False).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        client_tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in client_tags or "*" in client_tags:
+            return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
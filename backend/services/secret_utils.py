@@ -0,0 +1,99 @@
+"""
+Utility functions for encrypting stored connection secrets (e.g. pg_password)
+
+Secrets are encrypted with Fernet (AES-128-CBC + HMAC) and stored as URL-safe
+text tokens. The key comes from settings.SECRET_ENCRYPTION_KEY, kept apart from
+the JWT SECRET_KEY so that rotating JWTs does not make stored credentials
+unreadable. Tokens written with the former SECRET_KEY-derived key are still
+decrypted, and legacy plaintext values are returned as they are.
+
+Models use the EncryptedString column type, so every reader gets plaintext
+and every writer stores a token without calling these helpers directly.
+"""
+import base64
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Optional
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from sqlalchemy.types import String, TypeDecorator
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _derive_key(secret: str) -> bytes:
+    """Fernet key from an arbitrary secret string"""
+    return base64.urlsafe_b64encode(hashlib.sha256(secret.encode()).digest())
+
+
+@lru_cache(maxsize=1)
+def _get_fernet() -> MultiFernet:
+    """
+    Build the cipher once per process
+
+    Encrypts with the dedicated key; also decrypts tokens made with the
+    SECRET_KEY-derived key used before SECRET_ENCRYPTION_KEY existed.
+    """
+    legacy = Fernet(_derive_key(settings.SECRET_KEY))
+    if not settings.SECRET_ENCRYPTION_KEY:
+        logger.warning(
+            "SECRET_ENCRYPTION_KEY is not set: stored secrets are encrypted with a key "
+            "derived from SECRET_KEY and become unreadable if SECRET_KEY is rotated"
+        )
+        return MultiFernet([legacy])
+    return MultiFernet([Fernet(_derive_key(settings.SECRET_ENCRYPTION_KEY)), legacy])
+
+
+def encrypt_secret(value: Optional[str]) -> Optional[str]:
+    """
+    Encrypt a secret for storage
+
+    Args:
+        value: Plaintext secret (None/empty is stored as is)
+
+    Returns:
+        Fernet token as text
+    """
+    if not value:
+        return value
+    return _get_fernet().encrypt(value.encode()).decode()
+
+
+@lru_cache(maxsize=1024)
+def decrypt_secret(token: Optional[str]) -> Optional[str]:
+    """
+    Decrypt a stored secret
+
+    Cached by token: a changed secret produces a new token, so no
+    invalidation is needed.
+
+    Args:
+        token: Fernet token produced by encrypt_secret, or a legacy
+            plaintext value stored before encryption was introduced
+
+    Returns:
+        Plaintext secret
+    """
+    if not token:
+        return token
+    try:
+        return _get_fernet().decrypt(token.encode()).decode()
+    except InvalidToken:
+        # Legacy plaintext row: re-encrypted on its next write
+        return token
+
+
+class EncryptedString(TypeDecorator):
+    """String column holding a Fernet token, read and written as plaintext"""
+
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return encrypt_secret(value)
+
+    def process_result_value(self, value, dialect):
+        return decrypt_secret(value)
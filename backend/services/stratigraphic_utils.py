@@ -1,7 +1,7 @@
 """
 Utility functions for handling stratigraphic relationships in PyArchInit format
 """
-import json
+import orjson
 from typing import List, Dict, Optional
 
 
@@ -64,8 +64,8 @@ class StratigraphicRelationships:
         if isinstance(relationships_data, str):
             try:
                 # Try JSON parse
-                relationships_data = json.loads(relationships_data)
-            except json.JSONDecodeError:
+                relationships_data = orjson.loads(relationships_data)
+            except orjson.JSONDecodeError:
                 # Try Python literal eval
                 try:
                     import ast
@@ -127,7 +127,7 @@ class StratigraphicRelationships:
         if not relationships:
             return "[]"
 
-        return json.dumps(relationships, ensure_ascii=False)
+        return orjson.dumps(relationships).decode()
 
     @classmethod
     def parse_from_database(cls, db_value: Optional[str]) -> List[List[str]]:
@@ -242,3 +242,35 @@ def format_relationships_for_db(relationships: List[List[str]]) -> str:
 def relationships_to_text(relationships: List[List[str]]) -> List[str]:
     """Convert relationships to human-readable text"""
     return StratigraphicRelationships.to_human_readable(relationships)
+
+
+def convert_to_list_of_lists(value: any) -> List[List[str]]:
+    """Convert string or value to list-of-lists format for PyArchInit"""
+    if isinstance(value, str):
+        value = value.strip()
+        # String -> [["String"]]
+        return [[value]] if value else []
+    if isinstance(value, list) and value:
+        # Already list-of-lists? Return as is
+        if all(isinstance(item, list) for item in value):
+            return value
+        # List of strings -> [["item1"], ["item2"]]
+        return [[item] for item in value if item]
+    return []
+
+
+def format_list_fields_for_db(fields: Dict, names) -> Dict[str, str]:
+    """
+    Normalize several list-of-lists fields and format them for database storage
+
+    Args:
+        fields: Extracted fields dict (e.g. from AI interpretation)
+        names: Field names to normalize, e.g. ('inclusi', 'campioni')
+
+    Returns:
+        Dict mapping each field name to its JSON string for the database
+    """
+    return {
+        name: format_relationships_for_db(convert_to_list_of_lists(fields.get(name)))
+        for name in names
+    }
@@ -0,0 +1,87 @@
+"""
+Utility functions for saving uploaded files to disk
+"""
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+import aiofiles
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+# Read uploads in 1MB chunks so large files never sit fully in memory
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Leading bytes of the image formats Pillow decodes for uploads
+_IMAGE_MAGICS = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"BM", "bmp"),
+    (b"II*\x00", "tiff"),
+    (b"MM\x00*", "tiff"),
+)
+
+
+def _preallocate(fd: int, size: int) -> None:
+    """Reserve size bytes for fd; best effort (blocking: run in threadpool)"""
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except OSError:
+        pass
+
+
+async def save_upload_file(
+    upload: UploadFile,
+    destination: Union[str, Path],
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> int:
+    """
+    Stream an uploaded file to its final path in fixed-size chunks
+
+    Args:
+        upload: FastAPI UploadFile from the multipart request
+        destination: Target file path
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        Number of bytes written
+    """
+    written = 0
+    async with aiofiles.open(destination, 'wb') as out:
+        # Size is known once Starlette has spooled the part: reserve the blocks
+        # up front so the filesystem allocates them contiguously (Linux only)
+        if upload.size and hasattr(os, 'posix_fallocate'):
+            # posix_fallocate can block for a while on large files (and falls
+            # back to writing zeros on filesystems without fallocate)
+            await run_in_threadpool(_preallocate, out.fileno(), upload.size)
+        while chunk := await upload.read(chunk_size):
+            await out.write(chunk)
+            written += len(chunk)
+        if upload.size and written != upload.size:
+            await out.truncate(written)
+    return written
+
+
+async def sniff_image_type(upload: UploadFile) -> Optional[str]:
+    """
+    Identify an uploaded image from its first bytes (Content-Type is client-supplied)
+
+    Reads 16 bytes and rewinds, so the upload can still be consumed as a whole.
+
+    Args:
+        upload: FastAPI UploadFile from the multipart request
+
+    Returns:
+        Image format name, or None if the content is not a supported image
+    """
+    head = await upload.read(16)
+    await upload.seek(0)
+
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    for magic, kind in _IMAGE_MAGICS:
+        if head.startswith(magic):
+            return kind
+    return None
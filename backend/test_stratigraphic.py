@@ -4,7 +4,10 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from services.stratigraphic_utils import StratigraphicRelationships, parse_relationships, format_relationships_for_db
+from services.stratigraphic_utils import (
+    StratigraphicRelationships, parse_relationships, format_relationships_for_db,
+    convert_to_list_of_lists, format_list_fields_for_db
+)
 
 # Test parsing from list of lists
 test_data = [['Copre', '2045', '1', 'Scavo archeologico'], ['Taglia', '2044', '1', 'Scavo archeologico']]
@@ -41,4 +44,16 @@ assert inverse == 'Coperto da', "Inverse relationship wrong"
 readable = StratigraphicRelationships.to_human_readable(test_data)
 print(f'✓ Human readable: {readable}')
 
+# Test list-of-lists conversion
+assert convert_to_list_of_lists('  Carbone ') == [['Carbone']], "String conversion failed"
+assert convert_to_list_of_lists(['Carbone', '', 'Ossa']) == [['Carbone'], ['Ossa']], "List conversion failed"
+assert convert_to_list_of_lists([['Carbone']]) == [['Carbone']], "List-of-lists passthrough failed"
+assert convert_to_list_of_lists(None) == [], "None conversion failed"
+print('✓ Convert to list-of-lists')
+
+# Test bulk formatting of list fields
+formatted_fields = format_list_fields_for_db({'inclusi': 'Carbone', 'campioni': []}, ('inclusi', 'campioni', 'documentazione'))
+print(f'✓ Format list fields: {formatted_fields}')
+assert formatted_fields == {'inclusi': '[["Carbone"]]', 'campioni': '[]', 'documentazione': '[]'}, "List field formatting failed"
+
 print('\n✅ All stratigraphic utils tests passed!')